@@ -0,0 +1,153 @@
+"""
+Throughput benchmarks of the GraphQL paths of ``sentera.api``, run against ``graphql_server.MockGraphQLServer``.
+
+Measures fields pages per second and alerts per second, end-to-end latency percentiles and peak Python memory of
+each call, for an account of any size. With the library installed (``pip install -e .``), run for example::
+
+    python benchmarks/bench_graphql.py --fields 100000 --page-size 1000 --latency 0.05
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from graphql_server import MockGraphQLServer
+
+from sentera import api
+
+TOKEN = "benchmark"
+PERCENTILES = (50, 90, 99)
+
+
+def _measure(function, repeat):
+    """Return the latency of each of ``repeat`` calls, and the peak memory of one more traced call."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.array(latencies), peak
+
+
+def _report(name, latencies, peak, units, count):
+    percentiles = np.percentile(latencies * 1000, PERCENTILES)
+    print(
+        f"{name:<24} {count * len(latencies) / latencies.sum():>10.1f} {units}/s  "
+        + "  ".join(f"p{p}={v:8.1f}ms" for p, v in zip(PERCENTILES, percentiles))
+        + (f"  peak={peak / 2 ** 20:8.1f}MiB" if peak is not None else "")
+    )
+
+
+def bench_fields(server, args):
+    """Benchmark ``get_all_fields`` and ``get_fields_within_bounds``."""
+    pages = math.ceil(args.fields / args.page_size)
+    latencies, peak = _measure(
+        lambda: api.get_all_fields(TOKEN, page_size=args.page_size), args.repeat
+    )
+    _report("get_all_fields", latencies, peak, "pages", pages)
+
+    bounds = (25.0, -124.0, 37.0, -95.5)
+    within = len(
+        server.fields_of(dict(zip(("sw_lat", "sw_lon", "ne_lat", "ne_lon"), bounds)))
+    )
+    latencies, peak = _measure(
+        lambda: api.get_fields_within_bounds(TOKEN, *bounds, page_size=args.page_size),
+        args.repeat,
+    )
+    _report(
+        "get_fields_within_bounds",
+        latencies,
+        peak,
+        "pages",
+        max(math.ceil(within / args.page_size), 1),
+    )
+
+
+def bench_alerts(server, args):
+    """Benchmark ``create_alert`` and ``upsert_alerts``, for new and for unchanged alerts."""
+    alerts = [
+        {
+            "field_sentera_id": f"field{i}",
+            "name": "Benchmark alert",
+            "message": f"Alert {i}",
+            "key": "benchmark",
+            "details": {"value": i},
+        }
+        for i in range(args.alerts)
+    ]
+
+    def create_alerts():
+        for alert in alerts:
+            api.create_alert(token=TOKEN, **alert)
+
+    latencies, peak = _measure(create_alerts, args.repeat)
+    _report("create_alert", latencies, peak, "alerts", len(alerts))
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = os.path.join(directory, "alerts.db")
+        sent = server.alerts
+        started = time.perf_counter()
+        api.upsert_alerts(alerts, TOKEN, index)
+        _report(
+            "upsert_alerts (new)",
+            np.array([time.perf_counter() - started]),
+            None,
+            "alerts",
+            len(alerts),
+        )
+        latencies, peak = _measure(
+            lambda: api.upsert_alerts(alerts, TOKEN, index), args.repeat
+        )
+        _report("upsert_alerts (unchanged)", latencies, peak, "alerts", len(alerts))
+        print(
+            f"{'':<24} {server.alerts - sent} mutations sent for {len(alerts)} alerts"
+        )
+
+
+def main():
+    """Run the benchmarks selected on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--fields", type=int, default=10000, help="fields in the account"
+    )
+    parser.add_argument("--page-size", type=int, default=1000, help="fields per page")
+    parser.add_argument("--alerts", type=int, default=200, help="alerts posted per run")
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency (s)")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="random extra latency (s)"
+    )
+    parser.add_argument(
+        "--max-page-size", type=int, default=None, help="largest page served"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timed calls per benchmark"
+    )
+    parser.add_argument(
+        "--only", choices=("fields", "alerts"), default=None, help="run one suite"
+    )
+    args = parser.parse_args()
+
+    with MockGraphQLServer(
+        field_count=args.fields,
+        latency=args.latency,
+        jitter=args.jitter,
+        max_page_size=args.max_page_size,
+    ) as server:
+        os.environ["SENTERA_API_URL"] = server.url
+        if args.only in (None, "fields"):
+            bench_fields(server, args)
+        if args.only in (None, "alerts"):
+            bench_alerts(server, args)
+        print(f"{'':<24} {server.requests} GraphQL requests served")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark of the HTTP/1.1 and HTTP/2 transports of weather requests, run against ``weather_server.MockWeatherServer``.
+
+Runs the same batch of weather requests through ``sentera.weather.run_queries`` with its default ``aiohttp`` session
+over HTTP/1.1, and with ``sentera.transport.Http2Session`` over HTTP/2, reporting requests per second and the number
+of connections each opened. Results are assembled as Arrow tables, whose streamed columns cost little next to the
+requests, rather than merged into a pandas DataFrame, which would take most of the time of either transport. Needs
+``pip install sentera[http2,arrow]``. For example::
+
+    python benchmarks/bench_weather_transport.py --requests 2000 --latency 0.05 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import aiohttp
+from weather_server import MockWeatherServer
+
+from sentera import weather
+from sentera.scheduler import get_scheduler
+from sentera.transport import Http2Session
+
+
+def _run(url, args, session):
+    url_list = [
+        f"{url}/recent/hourly-temperature/{i}/-90" for i in range(args.requests)
+    ]
+    return weather.run_queries(
+        url_list,
+        [weather.WeatherVariable.Temperature] * len(url_list),
+        [["2021/05/01", "2021/05/05"]] * len(url_list),
+        weather.WeatherInterval.Hourly,
+        weather.WeatherType.Recent,
+        session=session,
+        backend="arrow",
+    )
+
+
+async def _http1(url, args):
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await _run(url, args, session)
+
+
+async def _http2(url, args):
+    session = Http2Session(max_connections=args.connections, prior_knowledge=True)
+    try:
+        return await _run(url, args, session)
+    finally:
+        await session.close()
+
+
+def bench(name, run, args, http2):
+    """Time one run of the batch against a fresh server."""
+    with MockWeatherServer(
+        records=args.records, latency=args.latency, http2=http2
+    ) as server:
+        started = time.perf_counter()
+        data_df = asyncio.run(run(server.url, args))
+        elapsed = time.perf_counter() - started
+    print(
+        f"{name:<8} {args.requests / elapsed:>10.1f} requests/s  {elapsed:8.2f}s  "
+        f"{server.connections:>5} connections  {len(data_df)} rows"
+    )
+
+
+def main():
+    """Run the benchmark with the options given on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000, help="weather requests")
+    parser.add_argument("--records", type=int, default=120, help="values per response")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="server latency (s)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=100, help="requests in flight at once"
+    )
+    parser.add_argument(
+        "--connections", type=int, default=4, help="HTTP/2 connections opened"
+    )
+    args = parser.parse_args()
+
+    os.environ["DISABLE_TQDM"] = "true"
+    get_scheduler().resize(args.concurrency)
+    bench("HTTP/1.1", _http1, args, http2=False)
+    bench("HTTP/2", _http2, args, http2=True)
+
+
+if __name__ == "__main__":
+    main()
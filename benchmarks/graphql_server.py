@@ -0,0 +1,152 @@
+"""
+Local stand-in for the Sentera GraphQL API, used by the benchmarks.
+
+Answers the ``fields`` queries issued by ``sentera.api.get_all_fields`` and ``sentera.api.get_fields_within_bounds``
+from a generated account of any size, and the ``create_alert`` mutation, after a configurable latency. Point the
+library at it by setting the ``SENTERA_API_URL`` environment variable to ``MockGraphQLServer.url``.
+"""
+import asyncio
+import random
+import re
+import threading
+
+from aiohttp import web
+
+PAGE_SIZE = re.compile(r"page_size:\s*(\d+)")
+RESULTS = re.compile(r"results\s*{([^{}]*)}")
+
+
+class MockGraphQLServer:
+    """GraphQL server running on its own event loop thread, serving a generated account of fields."""
+
+    def __init__(
+        self, field_count=10000, latency=0.0, jitter=0.0, max_page_size=None, seed=0
+    ):
+        """
+        Initialize a server. It is started by ``start`` or by entering it as a context manager.
+
+        :param field_count: (optional) Number of fields in the generated account.
+        :param latency: (optional) Seconds every response is delayed by.
+        :param jitter: (optional) Upper bound of a uniformly random extra delay, in seconds.
+        :param max_page_size: (optional) Largest page size served, whatever page size is requested.
+        :param seed: (optional) Seed of the generated field locations and of the jitter.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.requests = 0
+        self.alerts = 0
+        self.url = None
+
+        self._random = random.Random(seed)
+        self._fields = [
+            {
+                "sentera_id": f"field{i}",
+                "name": f"Field {i}",
+                "latitude": round(self._random.uniform(25.0, 49.0), 6),
+                "longitude": round(self._random.uniform(-124.0, -67.0), 6),
+                "active": True,
+            }
+            for i in range(field_count)
+        ]
+        self._within_bounds = {}
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    def fields_of(self, variables):
+        """Return the fields a query with these variables pages through."""
+        if "sw_lat" not in variables:
+            return self._fields
+        bounds = tuple(variables[k] for k in ("sw_lat", "sw_lon", "ne_lat", "ne_lon"))
+        if bounds not in self._within_bounds:
+            sw_lat, sw_lon, ne_lat, ne_lon = bounds
+            self._within_bounds[bounds] = [
+                field
+                for field in self._fields
+                if sw_lat <= field["latitude"] <= ne_lat
+                and sw_lon <= field["longitude"] <= ne_lon
+            ]
+        return self._within_bounds[bounds]
+
+    def _fields_response(self, query, variables):
+        page = variables["page"]
+        page_size = int(PAGE_SIZE.search(query).group(1))
+        if self.max_page_size:
+            page_size = min(page_size, self.max_page_size)
+        projection = RESULTS.search(query).group(1).split()
+
+        fields = self.fields_of(variables)
+        results = [
+            {key: field.get(key) for key in projection}
+            for field in fields[(page - 1) * page_size : page * page_size]
+        ]
+        return {
+            "fields": {
+                "total_count": len(fields),
+                "page": page,
+                "page_size": page_size,
+                "results": results,
+            }
+        }
+
+    def _alert_response(self, variables):
+        self.alerts += 1
+        return {
+            "create_alert": {
+                "sentera_id": f"alert{self.alerts}",
+                **{
+                    key: variables.get(key)
+                    for key in ("name", "message", "key", "url", "details")
+                },
+            }
+        }
+
+    async def _graphql(self, request):
+        self.requests += 1
+        body = await request.json()
+        await asyncio.sleep(self.latency + self._random.uniform(0.0, self.jitter))
+
+        query, variables = body["query"], body.get("variables") or {}
+        if "create_alert" in query:
+            data = self._alert_response(variables)
+        elif "fields" in query:
+            data = self._fields_response(query, variables)
+        else:
+            return web.json_response(
+                {"errors": [{"message": "Unsupported query"}]}, status=400
+            )
+        return web.json_response({"data": data})
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/graphql", self._graphql)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    def start(self):
+        """Start serving, and set ``url`` to the base url of the server."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Stop the server."""
+        self.stop()
@@ -0,0 +1,198 @@
+"""
+Local stand-in for the Sentera Weather API, used by the benchmarks.
+
+Answers every weather url with a generated response after a configurable latency, either over HTTP/1.1 (served by
+``aiohttp``) or over cleartext HTTP/2 with prior knowledge (served with the ``h2`` library, installed with
+``pip install sentera[http2]``). Point requests at ``MockWeatherServer.url``.
+"""
+import asyncio
+import datetime
+import json
+import threading
+
+from aiohttp import web
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:
+    h2 = None
+
+
+def weather_body(lat, long, records):
+    """Return the JSON body of a response holding ``records`` hourly values."""
+    start = datetime.datetime(2021, 5, 1)
+    return json.dumps(
+        {
+            "latitude": lat,
+            "longitude": long,
+            "series": [
+                {
+                    "validTime": (start + datetime.timedelta(hours=i)).strftime(
+                        "%Y-%m-%dT%H:%M:%SZ"
+                    ),
+                    "value": 10.0 + i % 24,
+                    "products": [{"name": "benchmark"}],
+                }
+                for i in range(records)
+            ],
+        }
+    ).encode()
+
+
+def _location(path):
+    lat, long = path.split("?")[0].rstrip("/").rsplit("/", 2)[-2:]
+    return float(lat), float(long)
+
+
+class _H2Protocol(asyncio.Protocol):
+    """Minimal HTTP/2 server connection, answering each request stream with a weather response."""
+
+    def __init__(self, server):
+        self.server = server
+        self.connection = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.transport = None
+        self._window_updated = asyncio.Event()
+
+    def connection_made(self, transport):
+        self.server.connections += 1
+        self.transport = transport
+        self.connection.initiate_connection()
+        self.transport.write(self.connection.data_to_send())
+
+    def data_received(self, data):
+        try:
+            events = self.connection.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self.transport.write(self.connection.data_to_send())
+            self.transport.close()
+            return
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                path = dict(event.headers)[":path"]
+                asyncio.ensure_future(self._respond(event.stream_id, path))
+            elif isinstance(event, h2.events.WindowUpdated):
+                self._window_updated.set()
+                self._window_updated = asyncio.Event()
+        self.transport.write(self.connection.data_to_send())
+
+    async def _respond(self, stream_id, path):
+        self.server.requests += 1
+        await asyncio.sleep(self.server.latency)
+        body = self.server.body(path)
+        try:
+            self.connection.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(body))),
+                ],
+            )
+            while body:
+                size = min(
+                    self.connection.local_flow_control_window(stream_id),
+                    self.connection.max_outbound_frame_size,
+                )
+                if size <= 0:
+                    self.transport.write(self.connection.data_to_send())
+                    await self._window_updated.wait()
+                    continue
+                chunk, body = body[:size], body[size:]
+                self.connection.send_data(stream_id, chunk, end_stream=not body)
+            self.transport.write(self.connection.data_to_send())
+        except h2.exceptions.StreamClosedError:
+            pass
+
+
+class MockWeatherServer:
+    """Weather API stand-in running on its own event loop thread."""
+
+    def __init__(self, records=120, latency=0.0, http2=False):
+        """
+        Initialize a server. It is started by ``start`` or by entering it as a context manager.
+
+        :param records: (optional) Number of hourly values in each response.
+        :param latency: (optional) Seconds every response is delayed by.
+        :param http2: (optional) If True, serve cleartext HTTP/2 with prior knowledge instead of HTTP/1.1.
+        """
+        if http2 and h2 is None:
+            raise ImportError("The HTTP/2 server needs h2: pip install sentera[http2]")
+        self.records = records
+        self.latency = latency
+        self.http2 = http2
+        self.requests = 0
+        self.connections = 0
+        self.url = None
+
+        self._bodies = {}
+        self._peers = set()
+        self._loop = None
+        self._thread = None
+        self._close = None
+
+    def body(self, path):
+        """Return the response body of a request path."""
+        location = _location(path)
+        if location not in self._bodies:
+            self._bodies[location] = weather_body(*location, self.records)
+        return self._bodies[location]
+
+    async def _handle(self, request):
+        self.requests += 1
+        self._peers.add(request.transport.get_extra_info("peername"))
+        self.connections = len(self._peers)
+        await asyncio.sleep(self.latency)
+        return web.Response(
+            body=self.body(request.path), content_type="application/json"
+        )
+
+    async def _start(self):
+        if self.http2:
+            server = await self._loop.create_server(
+                lambda: _H2Protocol(self), "127.0.0.1", 0
+            )
+
+            async def close():
+                server.close()
+                await server.wait_closed()
+
+            self._close = close
+            return server.sockets[0].getsockname()[1]
+
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self._handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self._close = runner.cleanup
+        return site._server.sockets[0].getsockname()[1]
+
+    def start(self):
+        """Start serving, and set ``url`` to the base url of the server."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Stop the server."""
+        self.stop()
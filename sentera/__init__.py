@@ -6,7 +6,38 @@ within the ``sentera.api`` moddule. However, in the future this library may be e
 via the Sentera Tile API. The library may also be extended to allow for basic calculations to be run against
 queried data, such as band math on requested imagery.
 """
-from sentera import api, auth, weather
+from sentera import (
+    alerts,
+    api,
+    auth,
+    backends,
+    cache,
+    catalog,
+    checkpoint,
+    metrics,
+    progress,
+    runner,
+    scheduler,
+    store,
+    transport,
+    weather,
+)
 from sentera._version import __version__
 
-__all__ = ["__version__", "api", "auth", "weather"]
+__all__ = [
+    "__version__",
+    "alerts",
+    "api",
+    "auth",
+    "backends",
+    "cache",
+    "catalog",
+    "checkpoint",
+    "metrics",
+    "progress",
+    "runner",
+    "scheduler",
+    "store",
+    "transport",
+    "weather",
+]
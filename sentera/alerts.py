@@ -0,0 +1,69 @@
+"""Local record of the alerts already posted, so repeated alerting runs only post what is new or has changed."""
+import hashlib
+import json
+import time
+
+from sentera.database import SQLiteFile
+
+
+class AlertIndex(SQLiteFile):
+    """
+    Index of the content last posted for each alert, keyed by (*field_sentera_id*, *key*).
+
+    Only a hash of the content of each alert (its name, message, url and details) is kept. Backed by a single SQLite
+    file, so the index survives between runs.
+    """
+
+    TABLE = "alerts"
+    COLUMNS = (
+        "field_sentera_id TEXT NOT NULL, "
+        "key TEXT NOT NULL, "
+        "content_hash TEXT NOT NULL, "
+        "sent_at REAL NOT NULL, "
+        "PRIMARY KEY (field_sentera_id, key)"
+    )
+
+    @staticmethod
+    def content_hash(name, message, url=None, details=None):
+        """
+        Return the hash identifying the content of an alert.
+
+        :param name: name of the alert
+        :param message: description of the alert
+        :param url: (optional) url link to more information about the alert
+        :param details: (optional) JSON serializable details of the alert
+        :return: **content_hash** - string
+        """
+        content = json.dumps(
+            {"name": name, "message": message, "url": url, "details": details},
+            sort_keys=True,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, field_sentera_id, key):
+        """
+        Return the content hash last recorded for an alert, or None if it was never sent.
+
+        :param field_sentera_id: A field id (string)
+        :param key: The client-defined key of the alert
+        :return: **content_hash** - string or None
+        """
+        row = self._fetchone(
+            "SELECT content_hash FROM alerts WHERE field_sentera_id = ? AND key = ?",
+            (field_sentera_id, key),
+        )
+        return None if row is None else row[0]
+
+    def record(self, field_sentera_id, key, content_hash):
+        """
+        Record that an alert was sent with the given content.
+
+        :param field_sentera_id: A field id (string)
+        :param key: The client-defined key of the alert
+        :param content_hash: Hash of the content sent, from ``content_hash``
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO alerts (field_sentera_id, key, content_hash, sent_at) "
+            "VALUES (?, ?, ?, ?)",
+            (field_sentera_id, key, content_hash, time.time()),
+        )
@@ -1,60 +1,114 @@
 """Functions exposed to the user that make requests to the Sentera Weather API."""
 import asyncio
+import contextlib
+import functools
+import json
 import math
 
-import requests
-from pandas import json_normalize
+from pandas import DataFrame, concat, isna, json_normalize
 
 from sentera import weather
+from sentera.alerts import AlertIndex
+from sentera.backends import Backend, concat_tables, from_arrow, records_table
+from sentera.cache import ResponseCache
 from sentera.configuration import Configuration
+from sentera.runner import get_runner
 
+FIELD_PROJECTION = ("sentera_id", "name", "latitude", "longitude")
+FIELDS_PAGE_SIZE = 1000
 
-def _run_sentera_query(query, token):
+
+def _run_sentera_query(query, token, cache=None):
     url = Configuration().sentera_api_url("/graphql")
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.post(url=url, json=query, headers=headers)
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+    cached = None
+    if cache is not None:
+        cached = cache.get(url, query)
+        headers.update(cache.conditional_headers(cached))
+    response = get_runner().http.post(url=url, json=query, headers=headers)
+    if response.status_code == 304 and cached is not None:
+        return json.loads(cached[0])
     if response.status_code != 200:
         raise Exception(
             "Request Failed {}. {}".format(response.status_code, response.text)
         )
 
+    if cache is not None:
+        cache.put(
+            url,
+            query,
+            response.content,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
     return response.json()
 
 
-def get_all_fields(token):
-    """
-    Return a pandas dataframe result with information on each field within the user's account.
+@contextlib.contextmanager
+def _opened_cache(cache):
+    if isinstance(cache, str):
+        with ResponseCache(cache) as cache:
+            yield cache
+    else:
+        yield cache
 
-    Returned dataframe has the following values: (*sentera_id*, *name*, *latitude*, *longitude*)
 
-    :param token: Sentera auth token returned from :code:`sentera.auth.get_auth_token()`.
-    :return: **fields_dataframe** - pandas dataframe
-    """
-    query = {
-        "query": "query AllFields{ fields { total_count results{sentera_id name latitude longitude}}}"
-    }
-    result = _run_sentera_query(query, token)
-    data = result["data"]["fields"]["results"]
-    return json_normalize(data)
+def _run_fields_query(query, variables, token, cache=None, backend=Backend.Pandas):
+    backend = Backend(backend)
+    page_table = json_normalize if backend == Backend.Pandas else records_table
+    with _opened_cache(cache) as cache:
+        data = {"query": query, "variables": variables}
+        response = _run_sentera_query(data, token, cache)
+
+        pages = [page_table(response["data"]["fields"]["results"])]
+        total_pages = math.ceil(
+            response["data"]["fields"]["total_count"]
+            / response["data"]["fields"]["page_size"]
+        )
 
+        for page in range(2, total_pages + 1):
+            variables["page"] = page
+            data = {"query": query, "variables": variables}
+            response = _run_sentera_query(data, token, cache)
+            pages.append(page_table(response["data"]["fields"]["results"]))
 
-def get_fields_within_bounds(token, sw_lat, sw_lon, ne_lat, ne_lon):
-    """
-    Return a pandas dataframe result of fields within a given boundry.
+    if backend != Backend.Pandas:
+        return from_arrow(concat_tables(pages), backend)
+    if len(pages) == 1:
+        return pages[0]
+    return concat(pages)
 
-    The function takes the southwest and northeast coordinates of a paticular area of interest,
-    returning all fields inside those coordinates.
 
-    :param token: Sentera auth token returned from :code:`sentera.auth.get_auth_token()`.
-    :param page:
-    :return: **fields_df** - pandas dataframe
-    """
-    query = """
+@functools.lru_cache(maxsize=None)
+def _all_fields_query(projection, page_size):
+    return """
+        query AllFields($page: Int!) {
+            fields(
+                pagination: {
+                    page: $page
+                    page_size: %d
+                }) {
+                    total_count
+                    page
+                    page_size
+                    results {
+                        %s
+                    }
+                }
+        }""" % (
+        page_size,
+        "\n                        ".join(projection),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _fields_within_bounds_query(projection, page_size):
+    return """
         query FieldsWithBounds($page: Int!, $sw_lat: Float!, $sw_lon: Float!, $ne_lat: Float!, $ne_lon: Float!) {
             fields(
                 pagination: {
                     page: $page
-                    page_size: 1000
+                    page_size: %d
                 }
                 bounds: {
                     sw_geo_coordinate: {
@@ -70,15 +124,73 @@ def get_fields_within_bounds(token, sw_lat, sw_lon, ne_lat, ne_lon):
                     page
                     page_size
                     results {
-                        sentera_id
-                        name
-                        latitude
-                        longitude
-                        active
+                        %s
                     }
                 }
-        }"""
+        }""" % (
+        page_size,
+        "\n                        ".join(projection),
+    )
+
+
+def get_all_fields(
+    token,
+    projection=FIELD_PROJECTION,
+    page_size=FIELDS_PAGE_SIZE,
+    cache=None,
+    backend="pandas",
+):
+    """
+    Return a pandas dataframe result with information on each field within the user's account.
 
+    Returned dataframe has one column per entry in ``projection``, by default: (*sentera_id*, *name*, *latitude*,
+    *longitude*)
+
+    :param token: Sentera auth token returned from :code:`sentera.auth.get_auth_token()`.
+    :param projection: (optional) GraphQL field attributes to request, e.g. *('sentera_id',)* to only list ids.
+                       Nested selections can be given as a single string, e.g. *'crop_season { name }'*.
+    :param page_size: (optional) Number of fields requested per page.
+    :param cache: (optional) A :code:`sentera.cache.ResponseCache`, or a path to one. Pages are revalidated with
+                  conditional requests and read back from it when unchanged.
+    :param backend: (optional) Either *'pandas'*, *'arrow'* or *'polars'*, or a :code:`sentera.backends.Backend`.
+                    *arrow* builds a :code:`pyarrow.Table` straight from the pages and *polars* wraps it in a
+                    :code:`polars.DataFrame` without copying. Defaults to *'pandas'*.
+    :return: **fields_dataframe** - pandas dataframe, or the table of ``backend``
+    """
+    query = _all_fields_query(tuple(projection), page_size)
+    return _run_fields_query(query, {"page": 1}, token, cache, backend)
+
+
+def get_fields_within_bounds(
+    token,
+    sw_lat,
+    sw_lon,
+    ne_lat,
+    ne_lon,
+    projection=FIELD_PROJECTION + ("active",),
+    page_size=FIELDS_PAGE_SIZE,
+    cache=None,
+    backend="pandas",
+):
+    """
+    Return a pandas dataframe result of fields within a given boundry.
+
+    The function takes the southwest and northeast coordinates of a paticular area of interest,
+    returning all fields inside those coordinates.
+
+    :param token: Sentera auth token returned from :code:`sentera.auth.get_auth_token()`.
+    :param sw_lat: latitude of the southwest corner
+    :param sw_lon: longitude of the southwest corner
+    :param ne_lat: latitude of the northeast corner
+    :param ne_lon: longitude of the northeast corner
+    :param projection: (optional) GraphQL field attributes to request. Defaults to (*sentera_id*, *name*, *latitude*,
+                       *longitude*, *active*).
+    :param page_size: (optional) Number of fields requested per page.
+    :param cache: (optional) A :code:`sentera.cache.ResponseCache`, or a path to one, as in :code:`get_all_fields`
+    :param backend: (optional) Either *'pandas'*, *'arrow'* or *'polars'*, as in :code:`get_all_fields`
+    :return: **fields_df** - pandas dataframe, or the table of ``backend``
+    """
+    query = _fields_within_bounds_query(tuple(projection), page_size)
     variables = {
         "page": 1,
         "sw_lat": sw_lat,
@@ -86,26 +198,65 @@ def get_fields_within_bounds(token, sw_lat, sw_lon, ne_lat, ne_lon):
         "ne_lat": ne_lat,
         "ne_lon": ne_lon,
     }
+    return _run_fields_query(query, variables, token, cache, backend)
 
-    data = {"query": query, "variables": variables}
-    response = _run_sentera_query(data, token)
 
-    fields = response["data"]["fields"]["results"]
-    fields_df = json_normalize(fields)
-    total_pages = math.ceil(
-        response["data"]["fields"]["total_count"]
-        / response["data"]["fields"]["page_size"]
-    )
+def _location_rows(location_list):
+    """Yield (*lat*, *long*[, *start*, *end*]) tuples from a list or a pandas DataFrame of locations."""
+    if isinstance(location_list, DataFrame):
+        columns = ["lat", "long"]
+        if {"start", "end"}.issubset(location_list.columns):
+            columns += ["start", "end"]
+        return location_list[columns].itertuples(index=False, name=None)
+    return location_list
 
-    for page in range(2, total_pages + 1):
-        variables["page"] = page
-        data = {"query": query, "variables": variables}
-        response = _run_sentera_query(data, token)
 
-        additional_fields = response["data"]["fields"]["results"]
-        fields_df = fields_df.append(json_normalize(additional_fields))
+def _location_interval(field_location, time_interval):
+    """Return the [*start*, *end*] of a location, or ``time_interval`` if it has none, e.g. a DataFrame row of NaNs."""
+    location_interval = list(field_location[2:4])
+    if len(location_interval) == 2 and not any(isna(location_interval)):
+        return location_interval
+    return time_interval
 
-    return fields_df
+
+def _weather_variables(weather_variables):
+    if not weather_variables:
+        weather_variables = [None]
+    return [
+        weather.WeatherVariable(weather_variable)
+        for weather_variable in weather_variables
+    ]
+
+
+def _weather_requests(
+    locations,
+    weather_type,
+    weather_variables,
+    weather_interval,
+    time_interval,
+    window_days,
+    split_intervals,
+):
+    """Yield (*url*, *weather_variable*, *time_interval*, (*lat*, *long*)) for every request the locations need."""
+    for field_location in locations:
+        location_interval = _location_interval(field_location, time_interval)
+        interval_key = tuple(location_interval) if location_interval else None
+        if interval_key not in split_intervals:
+            split_intervals[interval_key] = weather.split_time_interval(
+                location_interval, weather_type, weather_interval, window_days
+            )
+
+        location = (float(field_location[0]), float(field_location[1]))
+        for weather_variable in weather_variables:
+            weather_url = weather.build_weather_url(
+                weather_type,
+                weather_variable,
+                weather_interval,
+                field_location[0],
+                field_location[1],
+            )
+            for split_interval in split_intervals[interval_key]:
+                yield weather_url, weather_variable, split_interval, location
 
 
 def get_weather(
@@ -115,51 +266,129 @@ def get_weather(
     weather_interval=None,
     time_interval=None,
     sentera_api_key=None,
+    window_days=None,
+    checkpoint=None,
+    raise_on_error=True,
+    derive_daily=False,
+    store=None,
+    priority="batch",
+    transport=None,
+    cache=None,
+    backend="pandas",
+    progress=None,
 ):
     """
     Return a pandas DataFrame with desired weather information.
 
+    Each location may carry its own date range, given as (*lat*, *long*, *day_start*, *day_end*), in which case
+    only the windows that location needs are requested. Locations without their own range fall back to
+    ``time_interval``. All requests are made in a single pass regardless of how the ranges differ.
+
     :param weather_type: either a string (e.g. *'recent'*) or :code:`sentera.weather.WeatherType`
     :param weather_variables: list of strings (e.g. *['temperature', 'relative-humidity']*) or
                               list of :code:`sentera.weather.WeatherVariable`'s
     :param weather_interval: either a string (e.g. *'hourly'*) or :code:`sentera.weather.WeatherInterval`
     :param time_interval: [*day_start*, *day_end*] in format **YYYY/MM/DD** (eg. *['2020/01/01', '2020/01/03']*).
-                          Needed for *recent* weather types, but no others.
-    :param location_list: list of locations defined by (*lat*, *long*) to get weather for
+                          Needed for *recent* weather types, but no others. Ignored for locations that
+                          define their own date range.
+    :param location_list: list of locations defined by (*lat*, *long*) or (*lat*, *long*, *day_start*, *day_end*)
+                          to get weather for, or a pandas DataFrame with *lat*, *long* and optionally *start*
+                          and *end* columns
     :param sentera_api_key: (optional) A Sentera API key giving access to the data. Has a default hard coded value that works.
-    :return: **weather_dataframe** - pandas dataframe
+    :param window_days: (optional) Number of days covered by each *recent* request, either as an int or a
+                        :code:`sentera.weather.AdaptiveWindow` that resizes windows from observed responses.
+                        Defaults to :code:`sentera.weather.WINDOW_DAYS`.
+    :param checkpoint: (optional) A :code:`sentera.checkpoint.Checkpoint`, or a path to one, recording each completed
+                       request. Rerunning the same call against it only fetches requests that did not complete.
+    :param raise_on_error: (optional) When False, requests that fail after all retries are reported instead of
+                           discarding every other result. Defaults to True.
+    :param derive_daily: (optional) Only for *recent* *hourly* weather. When True, daily weather is derived from the
+                         hourly results with :code:`sentera.weather.hourly_to_daily` instead of being requested
+                         separately, and a tuple of (**hourly_dataframe**, **daily_dataframe**) is returned in place
+                         of **weather_dataframe**.
+    :param store: (optional) A :code:`sentera.store.WeatherStore` of the same interval, only for *recent* weather.
+                  Only the ranges it does not hold yet are requested, the responses are written into it, and the
+                  returned weather is read back from it.
+    :param priority: (optional) Either *'interactive'* or *'batch'*, or a :code:`sentera.scheduler.Priority`.
+                     Requests of *interactive* calls are sent ahead of those of concurrent *batch* calls, which
+                     still use every connection left idle. Defaults to *'batch'*.
+    :param transport: (optional) A :code:`sentera.transport.RecordingSession` or :code:`sentera.transport.ReplaySession`
+                      sending the weather requests in place of the shared connection pool, to record them or to replay
+                      a recording offline.
+    :param cache: (optional) A :code:`sentera.cache.ResponseCache`, or a path to one. Responses are revalidated with
+                  conditional requests and read back from it when unchanged, e.g. to refresh *seven-day-forecast*
+                  weather cheaply.
+    :param backend: (optional) Either *'pandas'*, *'arrow'* or *'polars'*, or a :code:`sentera.backends.Backend`.
+                    *arrow* decodes the responses straight into a :code:`pyarrow.Table` without building any pandas
+                    object, and *polars* wraps that table in a :code:`polars.DataFrame` without copying. ``store`` and
+                    ``derive_daily`` need *'pandas'*. Failure reports are pandas dataframes whatever the backend.
+                    Defaults to *'pandas'*.
+    :param progress: (optional) A callable, or list of callables, receiving rate-limited progress events of the
+                     requests as dicts, as described by :code:`sentera.progress.ProgressReporter`. Callbacks run on
+                     the background loop thread, so they should return quickly. Defaults to a :code:`tqdm` progress
+                     bar, unless the ``DISABLE_TQDM`` environment variable is set.
+    :return: **weather_dataframe** - pandas dataframe, or the table of ``backend``. When ``raise_on_error`` is False, a tuple of
+             (**weather_dataframe**, **failures**) where **failures** is a pandas dataframe that can be passed to
+             :code:`retry_weather_failures`.
     """
     weather_type = weather.WeatherType(weather_type)
     weather_interval = weather.WeatherInterval(weather_interval)
+    if derive_daily and (
+        weather_type != weather.WeatherType.Recent
+        or weather_interval != weather.WeatherInterval.Hourly
+    ):
+        raise ValueError("Daily weather can only be derived from recent hourly weather")
+    if (store is not None or derive_daily) and Backend(backend) != Backend.Pandas:
+        raise ValueError("store and derive_daily need the pandas backend")
 
     url_list = []
     weather_variables_list = []
     time_interval_list = []
+    request_locations = []
+    weather_variables = _weather_variables(weather_variables)
 
-    time_intervals = weather.split_time_interval(
-        time_interval, weather_type, weather_interval
-    )
-
-    if not weather_variables:
-        weather_variables = [None]
-
-    for time_interval in time_intervals:
-        for field_location in location_list:
-            for weather_variable in weather_variables:
-                weather_variable = weather.WeatherVariable(weather_variable)
-                weather_url = weather.build_weather_url(
-                    weather_type,
-                    weather_variable,
-                    weather_interval,
-                    field_location[0],
-                    field_location[1],
+    locations = _location_rows(location_list)
+    if store is not None:
+        if (
+            weather_type != weather.WeatherType.Recent
+            or store.weather_interval != weather_interval
+        ):
+            raise ValueError(
+                f"Store holds recent {store.weather_interval} weather, not {weather_type} {weather_interval}"
+            )
+        requested = []
+        for field_location in locations:
+            location_interval = _location_interval(field_location, time_interval)
+            if not location_interval:
+                raise ValueError(
+                    f"Time interval needed for {weather_type} weather types"
                 )
-                url_list.append(weather_url)
-                weather_variables_list.append(weather_variable)
-                time_interval_list.append(time_interval)
+            # Stored rows are keyed on float locations, as labelled by run_queries
+            requested.append(
+                (
+                    float(field_location[0]),
+                    float(field_location[1]),
+                    *location_interval,
+                )
+            )
+        locations = store.missing(requested, weather_variables)
+
+    for url, weather_variable, split_interval, location in _weather_requests(
+        locations,
+        weather_type,
+        weather_variables,
+        weather_interval,
+        time_interval,
+        window_days,
+        {},
+    ):
+        url_list.append(url)
+        weather_variables_list.append(weather_variable)
+        time_interval_list.append(split_interval)
+        request_locations.append(location)
 
-    loop = asyncio.get_event_loop()
-    weather_df = loop.run_until_complete(
+    runner = get_runner()
+    weather_df = runner.run(
         weather.run_queries(
             url_list,
             weather_variables_list,
@@ -167,11 +396,210 @@ def get_weather(
             weather_interval,
             weather_type,
             sentera_api_key,
+            adaptive_window=window_days
+            if isinstance(window_days, weather.AdaptiveWindow)
+            else None,
+            location_list=request_locations,
+            checkpoint=checkpoint,
+            raise_on_error=raise_on_error,
+            session=transport or runner.session,
+            priority=priority,
+            cache=cache,
+            backend=backend,
+            progress=progress,
         )
     )
+    if not raise_on_error:
+        weather_df, failures = weather_df
+    if store is not None:
+        store.write(weather_df)
+        weather_df = store.read(requested, weather_variables)
+    if derive_daily:
+        weather_df = (weather_df, weather.hourly_to_daily(weather_df))
+
+    if not raise_on_error:
+        return weather_df, failures
     return weather_df
 
 
+def get_weather_for_fields_within_bounds(
+    token,
+    sw_lat,
+    sw_lon,
+    ne_lat,
+    ne_lon,
+    weather_type,
+    weather_variables=None,
+    weather_interval=None,
+    time_interval=None,
+    sentera_api_key=None,
+    window_days=None,
+    raise_on_error=True,
+    priority="batch",
+    page_size=FIELDS_PAGE_SIZE,
+    transport=None,
+    progress=None,
+):
+    """
+    Return a pandas DataFrame with the weather of every field within a given boundary, keyed by field.
+
+    Equivalent to :code:`get_fields_within_bounds` followed by :code:`get_weather` on the returned latitudes and
+    longitudes, except that the two are pipelined: the weather requests of each page of fields are sent as soon as
+    that page arrives, while the remaining pages are still being fetched. Fields sharing a location only have their
+    weather requested once.
+
+    :param token: Sentera auth token returned from :code:`sentera.auth.get_auth_token()`.
+    :param sw_lat: latitude of the southwest corner
+    :param sw_lon: longitude of the southwest corner
+    :param ne_lat: latitude of the northeast corner
+    :param ne_lon: longitude of the northeast corner
+    :param weather_type: either a string (e.g. *'recent'*) or :code:`sentera.weather.WeatherType`
+    :param weather_variables: list of strings or :code:`sentera.weather.WeatherVariable`'s, as in :code:`get_weather`
+    :param weather_interval: either a string (e.g. *'hourly'*) or :code:`sentera.weather.WeatherInterval`
+    :param time_interval: [*day_start*, *day_end*] in format **YYYY/MM/DD**, as in :code:`get_weather`
+    :param sentera_api_key: (optional) A Sentera API key giving access to the data. Has a default hard coded value that works.
+    :param window_days: (optional) Number of days covered by each *recent* request, as in :code:`get_weather`
+    :param raise_on_error: (optional) When False, failed weather requests are reported instead of raised, as in
+                           :code:`get_weather`
+    :param priority: (optional) Either *'interactive'* or *'batch'*, as in :code:`get_weather`
+    :param page_size: (optional) Number of fields requested per page.
+    :param transport: (optional) A session recording or replaying the weather requests, as in :code:`get_weather`
+    :param progress: (optional) Callables receiving progress events of the weather requests, as in :code:`get_weather`
+    :return: **weather_dataframe** - pandas dataframe with a *sentera_id* column identifying the field of each row. When
+             ``raise_on_error`` is False, a tuple of (**weather_dataframe**, **failures**).
+    """
+    weather_type = weather.WeatherType(weather_type)
+    weather_interval = weather.WeatherInterval(weather_interval)
+    weather_variables = _weather_variables(weather_variables)
+
+    split_intervals = {}
+    interval_key = tuple(time_interval) if time_interval else None
+    split_intervals[interval_key] = weather.split_time_interval(
+        time_interval, weather_type, weather_interval, window_days
+    )
+
+    query = _fields_within_bounds_query(
+        ("sentera_id", "latitude", "longitude"), page_size
+    )
+    variables = {
+        "sw_lat": sw_lat,
+        "sw_lon": sw_lon,
+        "ne_lat": ne_lat,
+        "ne_lon": ne_lon,
+    }
+    field_pages = []
+    requested_locations = set()
+
+    def fetch_page(page):
+        data = {"query": query, "variables": dict(variables, page=page)}
+        return _run_sentera_query(data, token)["data"]["fields"]
+
+    def page_requests(fields):
+        field_pages.append(json_normalize(fields["results"]))
+        locations = []
+        for field in fields["results"]:
+            location = (field["latitude"], field["longitude"])
+            if None in location or location in requested_locations:
+                continue
+            requested_locations.add(location)
+            locations.append(location)
+        return _weather_requests(
+            locations,
+            weather_type,
+            weather_variables,
+            weather_interval,
+            time_interval,
+            window_days,
+            split_intervals,
+        )
+
+    async def batches():
+        loop = asyncio.get_running_loop()
+        fields = await loop.run_in_executor(None, fetch_page, 1)
+        yield page_requests(fields)
+
+        total_pages = math.ceil(fields["total_count"] / fields["page_size"])
+        pages = [
+            loop.run_in_executor(None, fetch_page, page)
+            for page in range(2, total_pages + 1)
+        ]
+        for page in asyncio.as_completed(pages):
+            yield page_requests(await page)
+
+    runner = get_runner()
+    weather_df = runner.run(
+        weather.run_query_batches(
+            batches(),
+            weather_interval,
+            weather_type,
+            sentera_api_key,
+            adaptive_window=window_days
+            if isinstance(window_days, weather.AdaptiveWindow)
+            else None,
+            raise_on_error=raise_on_error,
+            session=transport or runner.session,
+            priority=priority,
+            progress=progress,
+        )
+    )
+    if not raise_on_error:
+        weather_df, failures = weather_df
+
+    fields_df = concat(field_pages)
+    if fields_df.empty:
+        fields_df = DataFrame(columns=["sentera_id", "latitude", "longitude"])
+    fields_df = DataFrame(
+        {
+            "sentera_id": fields_df["sentera_id"],
+            "lat": fields_df["latitude"].astype(float),
+            "long": fields_df["longitude"].astype(float),
+        }
+    )
+    if weather_df.empty:
+        weather_df = weather_df.reindex(
+            columns=weather_df.columns.union(["lat", "long"], sort=False)
+        )
+    weather_df = fields_df.merge(weather_df, on=["lat", "long"], how="inner")
+
+    if not raise_on_error:
+        return weather_df, failures
+    return weather_df
+
+
+def retry_weather_failures(
+    failures,
+    weather_type,
+    weather_interval=None,
+    sentera_api_key=None,
+    checkpoint=None,
+    transport=None,
+):
+    """
+    Re-run only the failed requests of a :code:`get_weather` call made with ``raise_on_error=False``.
+
+    :param failures: failure report returned by :code:`get_weather`
+    :param weather_type: weather type of the original call
+    :param weather_interval: weather interval of the original call
+    :param sentera_api_key: (optional) A Sentera API key giving access to the data. Has a default hard coded value that works.
+    :param checkpoint: (optional) A :code:`sentera.checkpoint.Checkpoint`, or a path to one, recording each completed
+                       request.
+    :param transport: (optional) A session recording or replaying the weather requests, as in :code:`get_weather`
+    :return: (**weather_dataframe**, **failures**) - pandas dataframes of the newly fetched results and of the requests
+             that failed again
+    """
+    runner = get_runner()
+    return runner.run(
+        weather.rerun_failures(
+            failures,
+            weather.WeatherInterval(weather_interval),
+            weather.WeatherType(weather_type),
+            sentera_api_key=sentera_api_key,
+            checkpoint=checkpoint,
+            session=transport or runner.session,
+        )
+    )
+
+
 def create_alert(
     field_sentera_id, name, message, token, key=None, url=None, details=None
 ):
@@ -230,3 +658,61 @@ def create_alert(
     result = _run_sentera_query(data, token)
 
     return result
+
+
+def upsert_alerts(alerts, token, index):
+    """
+    Post only the alerts that are new or whose content changed since they were last posted.
+
+    Each alert is identified by its (*field_sentera_id*, *key*) pair. Its content is compared against the hash recorded
+    in ``index`` the last time it was posted, and the mutation is only sent if the two differ. Every alert sent is
+    recorded in ``index``, so rerunning the same alerts sends nothing.
+
+    :param alerts: iterable of dicts, or a pandas dataframe, with the arguments of :code:`create_alert`:
+                   *field_sentera_id*, *name*, *message*, *key* and optionally *url* and *details*. *key* is required.
+    :param token: an authorization token needed to post the alerts (string)
+    :param index: A :code:`sentera.alerts.AlertIndex`, or a path to one, of the alerts already posted.
+    :return: **results** - list with the result of :code:`create_alert` for each alert, or None for alerts that were
+             unchanged and therefore not posted. Alerts whose result holds GraphQL errors are not recorded.
+    """
+    if isinstance(alerts, DataFrame):
+        # Missing cells would otherwise come back as NaN, which is neither None nor valid JSON
+        alerts = alerts.astype(object).where(alerts.notna(), None).to_dict("records")
+
+    close_index = isinstance(index, str)
+    if close_index:
+        index = AlertIndex(index)
+
+    results = []
+    try:
+        for alert in alerts:
+            field_sentera_id, key = alert["field_sentera_id"], alert.get("key")
+            if key is None:
+                raise ValueError(
+                    f"Alert for field {field_sentera_id} needs a key to be upserted"
+                )
+            content_hash = AlertIndex.content_hash(
+                alert["name"], alert["message"], alert.get("url"), alert.get("details")
+            )
+            if index.get(field_sentera_id, key) == content_hash:
+                results.append(None)
+                continue
+
+            result = create_alert(
+                field_sentera_id,
+                alert["name"],
+                alert["message"],
+                token,
+                key=key,
+                url=alert.get("url"),
+                details=alert.get("details"),
+            )
+            results.append(result)
+            # A rejected mutation is not recorded, so it is sent again on the next run
+            if not result.get("errors"):
+                index.record(field_sentera_id, key, content_hash)
+    finally:
+        if close_index:
+            index.close()
+
+    return results
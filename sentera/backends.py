@@ -0,0 +1,185 @@
+"""
+Result backends: the kind of table weather and field results are returned as.
+
+Results are built as pandas DataFrames by default. The *arrow* backend builds them directly as ``pyarrow.Table`` from
+the decoded responses, without any intermediate pandas object, and the *polars* backend wraps that table in a
+``polars.DataFrame`` without copying it. Both need optional dependencies, installed with ``pip install sentera[arrow]``
+or ``pip install sentera[polars]``.
+"""
+import array
+import importlib
+from enum import Enum
+
+import numpy as np
+
+
+class Backend(Enum):
+    """Enumerable holding the kinds of table results can be returned as."""
+
+    Pandas = "pandas"
+    Arrow = "arrow"
+    Polars = "polars"
+
+    def __str__(self):
+        """Return the value of the Backend Enum as a string."""
+        return str(self.value)
+
+
+def _require(module, backend):
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"The {backend} backend needs {module}: pip install sentera[{backend}]"
+        ) from e
+
+
+def _pyarrow():
+    return _require("pyarrow", Backend.Arrow)
+
+
+def _flatten(table):
+    """Flatten struct columns into one column per member, named like ``pandas.json_normalize`` does."""
+    pa = _pyarrow()
+    while any(pa.types.is_struct(field.type) for field in table.schema):
+        table = table.flatten()
+    return table
+
+
+def records_table(records):
+    """
+    Return a ``pyarrow.Table`` of JSON records.
+
+    :param records: List of dicts, as decoded from a response
+    :return: **table** - ``pyarrow.Table`` with one column per key, nested dicts flattened
+    """
+    return _flatten(_pyarrow().Table.from_pylist(records))
+
+
+def concat_tables(tables):
+    """
+    Concatenate tables, filling the columns missing from some of them with nulls.
+
+    :param tables: List of ``pyarrow.Table``
+    :return: **table** - ``pyarrow.Table``
+    """
+    tables = [table for table in tables if table.num_columns]
+    if not tables:
+        return _pyarrow().table({})
+    if len(tables) == 1:
+        return tables[0]
+    return _pyarrow().concat_tables(tables, promote_options="default")
+
+
+def series_table(columns, lat, long):
+    """
+    Return a ``pyarrow.Table`` of the decoded ``series`` of a weather response.
+
+    :param columns: Dict of column name to values. Float64 ``array.array`` buffers are wrapped without copying, with
+                    NaN values marked as nulls.
+    :param lat: Latitude of the response
+    :param long: Longitude of the response
+    :return: **table** - ``pyarrow.Table``
+    """
+    pa = _pyarrow()
+    rows = 0
+    arrays = {}
+    for name, values in columns.items():
+        if isinstance(values, array.array):
+            values = np.frombuffer(values, dtype=np.float64)
+            arrays[name] = pa.array(values, mask=np.isnan(values))
+        else:
+            arrays[name] = pa.array(values)
+        rows = len(arrays[name])
+    arrays["lat"] = float_array(rows, lat)
+    arrays["long"] = float_array(rows, long)
+    return pa.table(arrays)
+
+
+def float_array(rows, value):
+    """
+    Return a float64 ``pyarrow.Array`` repeating a value.
+
+    :param rows: Length of the array
+    :param value: Value of every element
+    :return: **array** - ``pyarrow.Array``
+    """
+    return _pyarrow().array(np.full(rows, value, dtype=np.float64))
+
+
+def join_variables(tables, keys):
+    """
+    Join the tables of single weather variables into one table with a column per variable.
+
+    Tables of the same variable, e.g. from successive time windows, are concatenated, and the variables are then
+    joined on ``keys`` with a full outer join, as ``sentera.weather.run_queries`` does with pandas.
+
+    :param tables: List of ``pyarrow.Table``, each with the ``keys`` columns and one variable column
+    :param keys: Names of the columns identifying a row
+    :return: **table** - ``pyarrow.Table`` sorted by *lat*, *long* and time
+    """
+    pa = _pyarrow()
+    by_variable = {}
+    for table in tables:
+        variable = tuple(name for name in table.column_names if name not in keys)
+        by_variable.setdefault(variable, []).append(table)
+    if not by_variable:
+        return pa.table(
+            {
+                key: pa.array(
+                    [], pa.float64() if key in ("lat", "long") else pa.string()
+                )
+                for key in keys
+            }
+        )
+
+    joined = None
+    for variable_tables in by_variable.values():
+        table = concat_tables(variable_tables)
+        if len(variable_tables) > 1:
+            table = _last_per_key(table, keys)
+        if joined is None:
+            joined = table
+        else:
+            joined = joined.join(
+                table, keys=list(keys), join_type="full outer", coalesce_keys=True
+            )
+    return joined.sort_by(
+        [("lat", "ascending"), ("long", "ascending")]
+        + [(key, "ascending") for key in keys if key not in ("lat", "long")]
+    )
+
+
+def _last_per_key(table, keys):
+    """
+    Collapse rows repeating the same ``keys`` into one, keeping the last non-null value of every other column.
+
+    Adjacent time windows share their boundary day, which ``sentera.weather.run_queries`` collapses the same way with
+    pandas.
+    """
+    values = [name for name in table.column_names if name not in keys]
+    if not values or not table.num_rows:
+        return table
+    grouped = table.group_by(list(keys), use_threads=False).aggregate(
+        [(name, "last") for name in values]
+    )
+    names = {f"{name}_last": name for name in values}
+    return grouped.rename_columns(
+        [names.get(name, name) for name in grouped.column_names]
+    ).select(table.column_names)
+
+
+def from_arrow(table, backend):
+    """
+    Return an Arrow table as the kind of table of ``backend``.
+
+    :param table: ``pyarrow.Table``
+    :param backend: Backend, as a string or an instance of the ``sentera.backends.Backend`` Enum
+    :return: **table** - ``pyarrow.Table``, ``polars.DataFrame`` sharing its memory, or pandas DataFrame
+    """
+    backend = Backend(backend)
+    if backend == Backend.Polars:
+        return _require("polars", Backend.Polars).from_arrow(table)
+    if backend == Backend.Pandas:
+        return table.to_pandas()
+    return table
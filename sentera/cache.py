@@ -0,0 +1,79 @@
+"""
+Local cache of responses and their validators, revalidated with conditional requests.
+
+Responses carrying an *ETag* or *Last-Modified* header are stored along with them. Later requests for the same
+resource send them back as *If-None-Match* and *If-Modified-Since*, and a *304 Not Modified* answer is served from the
+cache, so refreshing an unchanged resource costs a header exchange instead of a full transfer. Responses without
+validators are not cached, and requests for them are sent unconditionally as before.
+"""
+import sqlite3
+
+from sentera.checkpoint import Checkpoint
+from sentera.database import SQLiteFile
+
+
+class ResponseCache(SQLiteFile):
+    """
+    Cached response bodies and their validators, keyed by URL and request parameters.
+
+    Backed by a single SQLite file. Entries are not keyed on credentials, so a cache should only be shared by callers
+    with access to the same data.
+    """
+
+    TABLE = "responses"
+    COLUMNS = "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL"
+
+    def get(self, url, params):
+        """
+        Return the cached response of a request, or None if it is not cached.
+
+        :param url: Request URL.
+        :param params: Dict of request parameters.
+        :return: (**body**, **etag**, **last_modified**) or None
+        """
+        row = self._fetchone(
+            "SELECT body, etag, last_modified FROM responses WHERE key = ?",
+            (Checkpoint.request_key(url, params),),
+        )
+        if row is None:
+            return None
+        body, etag, last_modified = row
+        return bytes(body), etag, last_modified
+
+    def put(self, url, params, body, etag=None, last_modified=None):
+        """
+        Cache the response of a request, if it carries a validator.
+
+        :param url: Request URL.
+        :param params: Dict of request parameters.
+        :param body: Response body, as bytes.
+        :param etag: (optional) Value of the *ETag* response header.
+        :param last_modified: (optional) Value of the *Last-Modified* response header.
+        """
+        key = Checkpoint.request_key(url, params)
+        if etag is None and last_modified is None:
+            self._execute("DELETE FROM responses WHERE key = ?", (key,))
+        else:
+            self._execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, body) "
+                "VALUES (?, ?, ?, ?)",
+                (key, etag, last_modified, sqlite3.Binary(body)),
+            )
+
+    @staticmethod
+    def conditional_headers(cached):
+        """
+        Return the headers revalidating a cached response.
+
+        :param cached: Cached response, as returned by ``get``, or None.
+        :return: **headers** - dict, empty if there is nothing to revalidate
+        """
+        if cached is None:
+            return {}
+        _, etag, last_modified = cached
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        return headers
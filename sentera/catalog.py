@@ -0,0 +1,232 @@
+"""Local, spatially indexed copy of the fields within a user's account."""
+import math
+import time
+
+import pandas as pd
+
+from sentera import api
+
+
+class FieldCatalog:
+    """
+    In-memory catalog of fields answering bounding box and nearest neighbor queries without a server round trip.
+
+    Fields are loaded once through :code:`sentera.api.get_all_fields` and bucketed into a regular grid of
+    ``cell_size`` degree cells over their *latitude* and *longitude*. Bounding box queries only visit the cells
+    overlapping the box, and nearest neighbor queries search outwards ring by ring from the query point's cell.
+
+    The Sentera API does not expose a way to list only the fields modified since a given time, so ``sync`` pulls the
+    catalog list again and re-indexes only the fields that were added, changed or removed since the last sync.
+    """
+
+    def __init__(self, token, cell_size=0.1, cache=None):
+        """
+        Create an empty catalog. Call ``sync`` to load the fields.
+
+        :param token: Sentera auth token returned from :code:`sentera.auth.get_auth_token()`.
+        :param cell_size: (optional) Size in degrees of the grid cells used to index the fields.
+        :param cache: (optional) A :code:`sentera.cache.ResponseCache`, or a path to one, so that ``sync`` revalidates
+                      the pages of the field list instead of downloading them again.
+        """
+        self.token = token
+        self.cell_size = cell_size
+        self.cache = cache
+        self.fields = pd.DataFrame(columns=["sentera_id", "latitude", "longitude"])
+        self.fields = self.fields.set_index("sentera_id", drop=False)
+        self.synced_at = None
+        self._locations = {}
+        self._cells = {}
+        self._extent = None
+
+    def __len__(self):
+        """Return the number of fields in the catalog."""
+        return len(self._locations)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def _index(self, sentera_id, lat, lon):
+        self._unindex(sentera_id)
+        if lat is None or lon is None or math.isnan(lat) or math.isnan(lon):
+            return
+        self._locations[sentera_id] = (lat, lon)
+        self._extent = None
+        self._cells.setdefault(self._cell(lat, lon), set()).add(sentera_id)
+
+    def _unindex(self, sentera_id):
+        location = self._locations.pop(sentera_id, None)
+        if location is None:
+            return
+        self._extent = None
+        cell = self._cell(*location)
+        self._cells[cell].discard(sentera_id)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def update(self, fields_df):
+        """
+        Add or replace fields in the catalog.
+
+        :param fields_df: pandas dataframe of fields, with at least *sentera_id*, *latitude* and *longitude* columns
+        :return: **changed** - number of fields that were added or whose values changed
+        """
+        if fields_df.empty:
+            return 0
+        fields_df = fields_df.drop_duplicates("sentera_id", keep="last")
+        fields_df = fields_df.set_index("sentera_id", drop=False)
+
+        known = fields_df.index.isin(self.fields.index)
+        changed = ~known
+        if known.any():
+            existing = self.fields.reindex(
+                index=fields_df.index[known], columns=fields_df.columns
+            )
+            incoming = fields_df[known]
+            differs = ~(
+                (existing == incoming) | (existing.isna() & incoming.isna())
+            ).all(axis=1)
+            changed[known] = differs.to_numpy()
+        changed_df = fields_df[changed]
+        if changed_df.empty:
+            return 0
+
+        unchanged = self.fields.drop(index=changed_df.index, errors="ignore")
+        if unchanged.empty:
+            self.fields = changed_df
+        else:
+            self.fields = pd.concat([unchanged, changed_df])
+        for sentera_id, lat, lon in zip(
+            changed_df["sentera_id"], changed_df["latitude"], changed_df["longitude"]
+        ):
+            self._index(sentera_id, lat, lon)
+        return len(changed_df)
+
+    def remove(self, sentera_ids):
+        """
+        Remove fields from the catalog.
+
+        :param sentera_ids: iterable of field sentera ids
+        """
+        sentera_ids = [i for i in sentera_ids if i in self.fields.index]
+        for sentera_id in sentera_ids:
+            self._unindex(sentera_id)
+        self.fields = self.fields.drop(index=sentera_ids)
+
+    def sync(self):
+        """
+        Bring the catalog up to date with the user's account.
+
+        :return: **changed** - number of fields that were added, changed or removed
+        """
+        fields_df = api.get_all_fields(self.token, cache=self.cache)
+        if fields_df.empty:
+            removed = list(self.fields.index)
+        else:
+            removed = list(self.fields.index.difference(fields_df["sentera_id"]))
+        self.remove(removed)
+        changed = self.update(fields_df)
+        self.synced_at = time.time()
+        return changed + len(removed)
+
+    def ids_within_bounds(self, sw_lat, sw_lon, ne_lat, ne_lon):
+        """
+        Return the sentera ids of the fields within a given boundary.
+
+        :param sw_lat: latitude of the southwest corner
+        :param sw_lon: longitude of the southwest corner
+        :param ne_lat: latitude of the northeast corner
+        :param ne_lon: longitude of the northeast corner
+        :return: **sentera_ids** - list of strings
+        """
+        sw_cell = self._cell(sw_lat, sw_lon)
+        ne_cell = self._cell(ne_lat, ne_lon)
+        cell_count = (ne_cell[0] - sw_cell[0] + 1) * (ne_cell[1] - sw_cell[1] + 1)
+        if cell_count > len(self._cells):
+            cells = (
+                ids
+                for cell, ids in self._cells.items()
+                if sw_cell[0] <= cell[0] <= ne_cell[0]
+                and sw_cell[1] <= cell[1] <= ne_cell[1]
+            )
+        else:
+            cells = (
+                self._cells.get((i, j), ())
+                for i in range(sw_cell[0], ne_cell[0] + 1)
+                for j in range(sw_cell[1], ne_cell[1] + 1)
+            )
+
+        found = []
+        for ids in cells:
+            for sentera_id in ids:
+                lat, lon = self._locations[sentera_id]
+                if sw_lat <= lat <= ne_lat and sw_lon <= lon <= ne_lon:
+                    found.append(sentera_id)
+        return found
+
+    def within_bounds(self, sw_lat, sw_lon, ne_lat, ne_lon):
+        """
+        Return a pandas dataframe of the fields within a given boundary.
+
+        Local equivalent of :code:`sentera.api.get_fields_within_bounds`.
+
+        :param sw_lat: latitude of the southwest corner
+        :param sw_lon: longitude of the southwest corner
+        :param ne_lat: latitude of the northeast corner
+        :param ne_lon: longitude of the northeast corner
+        :return: **fields_df** - pandas dataframe
+        """
+        ids = self.ids_within_bounds(sw_lat, sw_lon, ne_lat, ne_lon)
+        return self.fields.loc[ids].reset_index(drop=True)
+
+    def nearest(self, lat, lon, k=1):
+        """
+        Return a pandas dataframe of the ``k`` fields closest to a location, closest first.
+
+        Distances are approximated on an equirectangular projection around ``lat``, which is accurate at field
+        scale, and returned in degrees of latitude in a *distance* column.
+
+        :param lat: latitude of the location
+        :param lon: longitude of the location
+        :param k: (optional) number of fields to return
+        :return: **fields_df** - pandas dataframe
+        """
+        if self._extent is None and self._cells:
+            rows, columns = zip(*self._cells)
+            self._extent = (min(rows), max(rows), min(columns), max(columns))
+
+        scale = math.cos(math.radians(lat))
+        center = self._cell(lat, lon)
+        max_ring = -1
+        if self._extent is not None:
+            min_row, max_row, min_column, max_column = self._extent
+            max_ring = max(
+                center[0] - min_row,
+                max_row - center[0],
+                center[1] - min_column,
+                max_column - center[1],
+            )
+
+        candidates = []
+        for ring in range(max_ring + 1):
+            for i in range(center[0] - ring, center[0] + ring + 1):
+                for j in range(center[1] - ring, center[1] + ring + 1):
+                    if max(abs(i - center[0]), abs(j - center[1])) != ring:
+                        continue
+                    for sentera_id in self._cells.get((i, j), ()):
+                        field_lat, field_lon = self._locations[sentera_id]
+                        distance = math.hypot(
+                            field_lat - lat, (field_lon - lon) * scale
+                        )
+                        candidates.append((distance, sentera_id))
+            candidates.sort()
+            candidates = candidates[:k]
+            # Anything outside this ring is at least a full ring of cells away
+            if (
+                len(candidates) == k
+                and candidates[-1][0] <= ring * self.cell_size * scale
+            ):
+                break
+
+        fields_df = self.fields.loc[[i for _, i in candidates]].reset_index(drop=True)
+        fields_df["distance"] = [d for d, _ in candidates]
+        return fields_df
@@ -0,0 +1,55 @@
+"""Durable storage of completed weather requests, allowing long running jobs to resume after an interruption."""
+import json
+import sqlite3
+
+from sentera.database import SQLiteFile
+
+
+class Checkpoint(SQLiteFile):
+    """
+    Local record of completed weather requests and their response bodies.
+
+    Responses are keyed by their URL and query parameters and written as soon as each request finishes, so that a
+    rerun of the same plan against the same checkpoint only fetches what is missing. Backed by a single SQLite file.
+    """
+
+    TABLE = "responses"
+    COLUMNS = "key TEXT PRIMARY KEY, body BLOB NOT NULL"
+
+    @staticmethod
+    def request_key(url, params):
+        """
+        Return the key a request is stored under.
+
+        :param url: Request URL.
+        :param params: Dict of query parameters.
+        :return: **key** - string
+        """
+        return "{}?{}".format(url, json.dumps(params, sort_keys=True))
+
+    def get(self, url, params):
+        """
+        Return the stored response body of a request, or None if it has not completed yet.
+
+        :param url: Request URL.
+        :param params: Dict of query parameters.
+        :return: **body** - bytes or None
+        """
+        row = self._fetchone(
+            "SELECT body FROM responses WHERE key = ?",
+            (self.request_key(url, params),),
+        )
+        return None if row is None else bytes(row[0])
+
+    def put(self, url, params, body):
+        """
+        Store the response body of a completed request.
+
+        :param url: Request URL.
+        :param params: Dict of query parameters.
+        :param body: Response body, as bytes.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO responses (key, body) VALUES (?, ?)",
+            (self.request_key(url, params), sqlite3.Binary(body)),
+        )
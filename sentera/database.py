@@ -0,0 +1,59 @@
+"""Single table SQLite files, the base of the checkpoints, caches, archives and indexes kept on disk by this package."""
+import sqlite3
+import threading
+
+
+class SQLiteFile:
+    """
+    SQLite file holding a single table, opened so it can be shared between threads.
+
+    Subclasses name their table in ``TABLE`` and give its column definitions in ``COLUMNS``. The connection is opened
+    without SQLite's same thread check, since files are used from the thread of the background event loop and not only
+    from the thread that opened them, and every statement runs under a lock instead.
+    """
+
+    TABLE = None
+    COLUMNS = None
+
+    def __init__(self, path):
+        """
+        Open (or create) the file.
+
+        :param path: Path to the file.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ({self.COLUMNS})"
+        )
+        self._connection.commit()
+
+    def _fetchone(self, statement, parameters=()):
+        """Return the first row selected by a statement, or None."""
+        with self._lock:
+            return self._connection.execute(statement, parameters).fetchone()
+
+    def _execute(self, statement, parameters=()):
+        """Run a statement and commit it."""
+        with self._lock:
+            self._connection.execute(statement, parameters)
+            self._connection.commit()
+
+    def __len__(self):
+        """Return the number of rows stored."""
+        return self._fetchone(f"SELECT COUNT(*) FROM {self.TABLE}")[0]
+
+    def close(self):
+        """Close the underlying file."""
+        self._connection.close()
+
+    def __enter__(self):
+        """Return the file itself."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the file."""
+        self.close()
@@ -0,0 +1,165 @@
+"""
+Vectorized agronomic metrics derived from weather returned by ``sentera.api.get_weather``.
+
+All functions operate on the DataFrames produced by ``sentera.weather.run_queries``, keyed by *lat*, *long* and the
+``sentera.weather.TIME_COLUMNS`` column of their interval, and compute each metric per location in a single grouped
+pass rather than by looping over locations. Temperatures, bases and caps must be given in the same units.
+"""
+from sentera.weather import TIME_COLUMNS, WeatherVariable
+
+LOCATION_COLUMNS = ["lat", "long"]
+
+
+def _time_column(weather_df):
+    for time_column in TIME_COLUMNS.values():
+        if time_column in weather_df:
+            return time_column
+    raise ValueError(
+        "Weather DataFrame has none of the time columns {}".format(
+            list(TIME_COLUMNS.values())
+        )
+    )
+
+
+def _sorted(weather_df):
+    return weather_df.sort_values(
+        LOCATION_COLUMNS + [_time_column(weather_df)], ignore_index=True
+    )
+
+
+def growing_degree_days(weather_df, base=10.0, cap=30.0):
+    """
+    Return the growing degree days accumulated in each row of a weather DataFrame.
+
+    Daily weather uses the capped average of *high-temperature* and *low-temperature*, with both clipped to
+    [``base``, ``cap``]. Hourly weather clips each hourly *temperature* to the same range and contributes 1/24th of a
+    degree day per hour.
+
+    :param weather_df: Pandas DataFrame of daily or hourly weather
+    :param base: (optional) Base temperature below which no growth accumulates
+    :param cap: (optional) Temperature above which growth no longer increases
+    :return: gdd: Pandas Series aligned with ``weather_df``
+    """
+    high = str(WeatherVariable.HighTemperature)
+    low = str(WeatherVariable.LowTemperature)
+    temperature = str(WeatherVariable.Temperature)
+
+    if high in weather_df and low in weather_df:
+        average = (
+            weather_df[high].clip(base, cap) + weather_df[low].clip(base, cap)
+        ) / 2
+        return (average - base).rename("gdd")
+    if temperature in weather_df:
+        return ((weather_df[temperature].clip(base, cap) - base) / 24).rename("gdd")
+    raise ValueError(
+        f"Growing degree days need either {high} and {low}, or {temperature}"
+    )
+
+
+def cumulative_sum(weather_df, column):
+    """
+    Return the running total of a column per location, in time order.
+
+    :param weather_df: Pandas DataFrame of weather, sorted by location and time
+    :param column: Name of the column to accumulate
+    :return: Pandas Series aligned with ``weather_df``
+    """
+    return weather_df.groupby(LOCATION_COLUMNS, sort=False)[column].cumsum()
+
+
+def rolling_sum(weather_df, column, window):
+    """
+    Return the trailing sum of a column over ``window`` rows per location, in time order.
+
+    :param weather_df: Pandas DataFrame of weather, sorted by location and time
+    :param column: Name of the column to sum
+    :param window: Number of rows (days for daily weather, hours for hourly weather) in each sum
+    :return: Pandas Series aligned with ``weather_df``
+    """
+    rolled = (
+        weather_df.groupby(LOCATION_COLUMNS, sort=False)[column]
+        .rolling(window, min_periods=1)
+        .sum()
+    )
+    return rolled.reset_index(level=list(range(len(LOCATION_COLUMNS))), drop=True)
+
+
+def dry_spell_length(
+    weather_df, column=str(WeatherVariable.Precipitation), threshold=0.0
+):
+    """
+    Return the number of consecutive rows, up to and including each row, with precipitation at or below a threshold.
+
+    :param weather_df: Pandas DataFrame of weather, sorted by location and time
+    :param column: (optional) Name of the precipitation column
+    :param threshold: (optional) Largest amount of precipitation still counted as dry. Missing values count as dry.
+    :return: Pandas Series of integers aligned with ``weather_df``
+    """
+    dry = weather_df[column].fillna(0) <= threshold
+    new_location = (
+        weather_df[LOCATION_COLUMNS]
+        .ne(weather_df[LOCATION_COLUMNS].shift())
+        .any(axis=1)
+    )
+    spell = (new_location | ~dry).cumsum()
+    return dry.astype(int).groupby(spell).cumsum()
+
+
+def compute_metrics(
+    weather_df,
+    gdd_base=10.0,
+    gdd_cap=30.0,
+    rolling_window=7,
+    dry_threshold=0.0,
+    evapotranspiration=WeatherVariable.EvapotranspirationShort,
+):
+    """
+    Return a copy of a weather DataFrame with agronomic metrics added, sorted by location and time.
+
+    Metrics are only added when the columns they depend on are present:
+
+    * *gdd* and *cumulative_gdd* - growing degree days, see ``growing_degree_days``
+    * *cumulative_precipitation* and *rolling_precipitation* - running and trailing ``rolling_window`` totals
+    * *dry_spell* - consecutive dry rows, see ``dry_spell_length``
+    * *water_balance* and *cumulative_water_balance* - precipitation minus ``evapotranspiration``
+
+    :param weather_df: Pandas DataFrame of daily or hourly weather, as returned by ``sentera.api.get_weather``
+    :param gdd_base: (optional) Base temperature of the growing degree days
+    :param gdd_cap: (optional) Cap temperature of the growing degree days
+    :param rolling_window: (optional) Number of rows in the trailing precipitation total
+    :param dry_threshold: (optional) Largest amount of precipitation still counted as dry
+    :param evapotranspiration: (optional) Evapotranspiration variable used in the water balance, as an instance of the
+                               ``sentera.weather.WeatherVariable`` Enum
+    :return: metrics_df: Pandas DataFrame
+    """
+    metrics_df = _sorted(weather_df)
+    precipitation = str(WeatherVariable.Precipitation)
+    evapotranspiration = str(WeatherVariable(evapotranspiration))
+    high = str(WeatherVariable.HighTemperature)
+    low = str(WeatherVariable.LowTemperature)
+    temperature = str(WeatherVariable.Temperature)
+
+    if (high in metrics_df and low in metrics_df) or temperature in metrics_df:
+        metrics_df["gdd"] = growing_degree_days(metrics_df, gdd_base, gdd_cap)
+        metrics_df["cumulative_gdd"] = cumulative_sum(metrics_df, "gdd")
+
+    if precipitation in metrics_df:
+        metrics_df["cumulative_precipitation"] = cumulative_sum(
+            metrics_df, precipitation
+        )
+        metrics_df["rolling_precipitation"] = rolling_sum(
+            metrics_df, precipitation, rolling_window
+        )
+        metrics_df["dry_spell"] = dry_spell_length(
+            metrics_df, precipitation, dry_threshold
+        )
+
+        if evapotranspiration in metrics_df:
+            metrics_df["water_balance"] = (
+                metrics_df[precipitation] - metrics_df[evapotranspiration]
+            )
+            metrics_df["cumulative_water_balance"] = cumulative_sum(
+                metrics_df, "water_balance"
+            )
+
+    return metrics_df
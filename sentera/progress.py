@@ -0,0 +1,178 @@
+"""
+Structured progress events of weather runs.
+
+``sentera.weather.run_queries`` keeps a few counters up to date as requests are planned, sent and completed, and only
+hands a snapshot of them to its progress callbacks every ``interval`` seconds, plus once when the run ends. Callbacks
+therefore cost nothing per response, however large the run, and receive plain dicts that can be logged or forwarded to
+a dashboard as they are. ``TqdmProgress`` is the callback drawing a progress bar in the terminal.
+"""
+import os
+import time
+from distutils.util import strtobool
+
+import tqdm
+
+EVENT_KEYS = [
+    "planned",
+    "in_flight",
+    "done",
+    "failed",
+    "bytes",
+    "elapsed",
+    "requests_per_second",
+    "bytes_per_second",
+    "eta",
+    "finished",
+]
+
+
+class ProgressReporter:
+    """
+    Counts the requests of a run and reports them to callbacks at most every ``interval`` seconds.
+
+    Each callback is called with a dict holding the ``EVENT_KEYS``:
+
+    * *planned*: requests planned so far, or the total number of requests when known in advance
+    * *in_flight*: requests sent and still waiting for their response
+    * *done*, *failed*: requests completed, successfully or not
+    * *bytes*: response bytes received
+    * *elapsed*: seconds since the run started
+    * *requests_per_second*, *bytes_per_second*: average throughput so far
+    * *eta*: estimated seconds until every planned request completes, or None before the first one does
+    * *finished*: True for the last event of the run, and only for it
+    """
+
+    def __init__(self, callbacks, total=None, interval=0.5):
+        """
+        Initialize a reporter.
+
+        :param callbacks: List of callables, each called with every event.
+        :param total: (optional) Total number of requests of the run, when known in advance.
+        :param interval: (optional) Minimum number of seconds between two events.
+        """
+        self.callbacks = list(callbacks)
+        self.total = total
+        self.interval = interval
+        self.planned = 0
+        self.in_flight = 0
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._last_event = None
+
+    def plan(self, count=1):
+        """Count newly planned requests."""
+        self.planned += count
+        self._maybe_report()
+
+    def send(self):
+        """Count a request being sent."""
+        self.in_flight += 1
+
+    def receive(self, nbytes):
+        """Count the bytes of a response."""
+        self.bytes += nbytes
+
+    def release(self):
+        """Count a sent request no longer waiting for its response."""
+        self.in_flight -= 1
+
+    def complete(self, failed=False):
+        """
+        Count a completed request.
+
+        :param failed: (optional) Whether the request failed.
+        """
+        if failed:
+            self.failed += 1
+        else:
+            self.done += 1
+        self._maybe_report()
+
+    def event(self, finished=False):
+        """
+        Return a snapshot of the counters.
+
+        :param finished: (optional) Whether the run is over.
+        :return: **event** - dict holding the ``EVENT_KEYS``
+        """
+        elapsed = time.monotonic() - self.started
+        completed = self.done + self.failed
+        planned = max(self.total or 0, self.planned)
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        return {
+            "planned": planned,
+            "in_flight": self.in_flight,
+            "done": self.done,
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "elapsed": elapsed,
+            "requests_per_second": rate,
+            "bytes_per_second": self.bytes / elapsed if elapsed > 0 else 0.0,
+            "eta": (planned - completed) / rate if rate else None,
+            "finished": finished,
+        }
+
+    def _maybe_report(self):
+        now = time.monotonic()
+        if self._last_event is None or now - self._last_event >= self.interval:
+            self.report()
+
+    def report(self, finished=False):
+        """
+        Send an event to every callback now.
+
+        :param finished: (optional) Whether the run is over.
+        """
+        self._last_event = time.monotonic()
+        if not self.callbacks:
+            return
+        event = self.event(finished)
+        for callback in self.callbacks:
+            callback(event)
+
+    def close(self):
+        """Send the last event of the run."""
+        self.report(finished=True)
+
+
+class TqdmProgress:
+    """Progress callback drawing a ``tqdm`` progress bar of the completed requests."""
+
+    def __init__(self, **tqdm_kwargs):
+        """
+        Initialize the callback. The bar is created with the first event.
+
+        :param tqdm_kwargs: (optional) Keyword arguments of ``tqdm.tqdm``.
+        """
+        self.tqdm_kwargs = tqdm_kwargs
+        self._bar = None
+
+    def __call__(self, event):
+        """Update the bar with an event."""
+        if self._bar is None:
+            self._bar = tqdm.tqdm(total=event["planned"], **self.tqdm_kwargs)
+        self._bar.total = event["planned"]
+        self._bar.update(event["done"] + event["failed"] - self._bar.n)
+        if event["failed"]:
+            self._bar.set_postfix(failed=event["failed"], refresh=False)
+        if event["finished"]:
+            self._bar.close()
+
+
+def progress_callbacks(progress=None):
+    """
+    Return the list of callbacks of a ``progress`` argument.
+
+    :param progress: (optional) Callable, list of callables, or None for the default ``TqdmProgress`` bar, which the
+                     ``DISABLE_TQDM`` environment variable turns off.
+    :return: **callbacks** - list of callables
+    """
+    if progress is None:
+        if strtobool(os.environ.get("DISABLE_TQDM") or "false"):
+            return []
+        return [TqdmProgress()]
+    if callable(progress):
+        return [progress]
+    return list(progress)
@@ -0,0 +1,137 @@
+"""
+Process-wide background event loop shared by every thread making Sentera API requests.
+
+The synchronous functions of ``sentera.api`` submit their weather requests to a single event loop running in a
+dedicated daemon thread, instead of running a loop of their own in the calling thread. They can therefore be called
+from any number of threads at once, and every call shares one ``aiohttp.ClientSession`` connection pool and the
+concurrency budget of ``sentera.scheduler``. GraphQL requests, which are blocking, share one ``requests.Session`` and
+run on the thread pool of the loop.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+
+import aiohttp
+import requests
+
+
+class BackgroundRunner:
+    """Event loop running in its own thread, to which other threads submit work and get futures back."""
+
+    def __init__(self, max_workers=16):
+        """
+        Initialize a runner. The thread is started by the first call needing it.
+
+        :param max_workers: (optional) Number of threads running blocking calls, such as GraphQL requests.
+        """
+        self.max_workers = max_workers
+        self.loop = None
+        self.session = None
+        self._thread = None
+        self._executor = None
+        self._http = None
+        self._lock = threading.Lock()
+
+    @property
+    def http(self):
+        """Return the ``requests.Session`` shared by every GraphQL request."""
+        with self._lock:
+            if self._http is None:
+                self._http = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.max_workers)
+                self._http.mount("https://", adapter)
+                self._http.mount("http://", adapter)
+            return self._http
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="sentera-io"
+            )
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(self._executor)
+            self._thread = threading.Thread(
+                target=self.loop.run_forever, name="sentera-loop", daemon=True
+            )
+            self._thread.start()
+            self.session = asyncio.run_coroutine_threadsafe(
+                self._open_session(), self.loop
+            ).result()
+
+    @staticmethod
+    async def _open_session():
+        return aiohttp.ClientSession()
+
+    def submit(self, coroutine):
+        """
+        Schedule a coroutine on the background loop.
+
+        :param coroutine: Coroutine to run. Coroutines making weather requests should pass ``session`` on to share
+                          the connection pool.
+        :return: **future** - ``concurrent.futures.Future`` of the result of the coroutine
+        """
+        self._start()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError(
+                "Cannot wait for the background loop from its own thread"
+            )
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine):
+        """
+        Run a coroutine on the background loop and wait for its result.
+
+        :param coroutine: Coroutine to run
+        :return: result of the coroutine
+        """
+        return self.submit(coroutine).result()
+
+    def call(self, function, *args, **kwargs):
+        """
+        Run a blocking function, such as a GraphQL request, on the thread pool of the background loop.
+
+        :param function: Function to call
+        :param args: Positional arguments of the function
+        :param kwargs: Keyword arguments of the function
+        :return: **future** - ``concurrent.futures.Future`` of the result of the function
+        """
+        self._start()
+        return self._executor.submit(function, *args, **kwargs)
+
+    def close(self):
+        """Close the shared sessions and stop the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            http, self._http = self._http, None
+        if http is not None:
+            http.close()
+        if thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join()
+        self.loop.close()
+        self._executor.shutdown()
+        self.loop = self.session = self._executor = None
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """
+    Return the process-wide runner shared by every Sentera API request.
+
+    :return: **runner** - ``sentera.runner.BackgroundRunner``
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = BackgroundRunner()
+            atexit.register(_runner.close)
+        return _runner
@@ -0,0 +1,150 @@
+"""
+Process-wide scheduling of Weather API requests across concurrent jobs.
+
+Every ``sentera.weather.run_queries`` call is a job whose requests wait for one of a fixed number of slots before
+being sent. Freed slots go to the highest priority class with requests waiting, and within a class to each waiting job
+in turn, so an interactive request is dispatched ahead of a large batch backfill while batch work still fills every
+slot that interactive work leaves idle.
+"""
+import asyncio
+import collections
+import contextlib
+import threading
+from enum import Enum
+
+
+class Priority(Enum):
+    """Enumerable holding the priority classes of weather requests, highest priority first."""
+
+    Interactive = "interactive"
+    Batch = "batch"
+
+    def __str__(self):
+        """Return the value of the Priority Enum as a string."""
+        return str(self.value)
+
+
+class WeatherScheduler:
+    """Limits the number of requests in flight and decides which waiting request is sent next."""
+
+    def __init__(self, limit=100):
+        """
+        Initialize a scheduler.
+
+        :param limit: (optional) Maximum number of requests in flight at once. Defaults to the connection limit of an
+                      ``aiohttp.ClientSession``.
+        """
+        self.limit = limit
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiting = {priority: collections.OrderedDict() for priority in Priority}
+
+    def resize(self, limit):
+        """
+        Change the maximum number of requests in flight, dispatching waiting requests if it grew.
+
+        :param limit: New maximum number of requests in flight.
+        """
+        with self._lock:
+            self.limit = limit
+            ready = self._dispatch()
+        for waiter in ready:
+            self._wake(waiter)
+
+    def waiting(self, priority=None):
+        """
+        Return the number of requests waiting for a slot.
+
+        :param priority: (optional) Only count requests of this priority, as a string or an instance of the
+                         ``sentera.scheduler.Priority`` Enum.
+        """
+        with self._lock:
+            priorities = [Priority(priority)] if priority else list(Priority)
+            return sum(
+                len(queue)
+                for priority in priorities
+                for queue in self._waiting[priority].values()
+            )
+
+    def _dispatch(self):
+        """Hand free slots to waiting requests. Must be called with the lock held."""
+        ready = []
+        for priority in Priority:
+            jobs = self._waiting[priority]
+            while jobs and self.active < self.limit:
+                job, queue = jobs.popitem(last=False)
+                ready.append(queue.popleft())
+                self.active += 1
+                if queue:
+                    # Back of the line, so the other jobs of this class get the next slots
+                    jobs[job] = queue
+        return ready
+
+    def _wake(self, waiter):
+        loop = waiter.get_loop()
+        if loop.is_closed():
+            self._release()
+            return
+        loop.call_soon_threadsafe(self._resolve, waiter)
+
+    def _resolve(self, waiter):
+        if waiter.cancelled():
+            self._release()
+        else:
+            waiter.set_result(None)
+
+    def _release(self):
+        with self._lock:
+            self.active -= 1
+            ready = self._dispatch()
+        for waiter in ready:
+            self._wake(waiter)
+
+    async def _acquire(self, priority, job):
+        with self._lock:
+            if self.active < self.limit and not any(self._waiting.values()):
+                self.active += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            queue = self._waiting[priority].setdefault(job, collections.deque())
+            queue.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Cancelled after being handed a slot, which would otherwise never be released
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority=Priority.Batch, job=None):
+        """
+        Wait for a free slot and hold it for the duration of the ``async with`` block.
+
+        :param priority: (optional) Priority class of the request, as a string or an instance of the
+                         ``sentera.scheduler.Priority`` Enum.
+        :param job: (optional) Hashable identifying the job the request belongs to. Jobs of the same priority class
+                    take turns at free slots.
+        """
+        await self._acquire(Priority(priority), job)
+        try:
+            yield
+        finally:
+            self._release()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    Return the process-wide scheduler shared by every weather request.
+
+    :return: **scheduler** - ``sentera.scheduler.WeatherScheduler``
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WeatherScheduler()
+        return _scheduler
@@ -0,0 +1,345 @@
+"""
+Local columnar store of *recent* weather, read through memory mapping.
+
+Each weather variable is kept as one contiguous float64 array of shape (*location*, *time*) in its own ``.npy`` file,
+next to a boolean array marking which cells have been fetched. Arrays are opened with ``numpy.load(mmap_mode=...)``, so
+slicing one variable for thousands of locations neither parses nor copies anything until it is actually read.
+"""
+import datetime
+import json
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+
+from sentera.weather import TIME_COLUMNS, WeatherInterval, WeatherVariable
+
+DATE_FORMAT = "%Y/%m/%d"
+STEPS_PER_DAY = {WeatherInterval.Hourly: 24, WeatherInterval.Daily: 1}
+
+
+class WeatherStore:
+    """
+    Directory of memory mapped weather arrays for a single weather interval.
+
+    Locations are rows, in the order they were first written, and time steps are columns counted from ``origin``, the
+    midnight of the earliest day written. Both axes grow as new data is written, with spare capacity reserved so that
+    appending does not rewrite the arrays every time.
+
+    Requests are described by rows of (*lat*, *long*, *day_start*, *day_end*) with days in **YYYY/MM/DD** format, as
+    accepted by ``sentera.api.get_weather``. ``missing`` returns only the rows still needing a fetch, ``write`` stores
+    the DataFrame returned for them, and ``read`` returns the requested rows from disk.
+    """
+
+    def __init__(self, path, weather_interval=WeatherInterval.Daily):
+        """
+        Open (or create) a weather store.
+
+        :param path: Directory holding the store.
+        :param weather_interval: (optional) Interval of the stored weather, as a string or an instance of the
+                                 ``sentera.weather.WeatherInterval`` Enum. Must match the interval the store was
+                                 created with.
+        """
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.weather_interval = WeatherInterval(weather_interval)
+        if self.weather_interval not in STEPS_PER_DAY:
+            raise ValueError(f"Weather interval not supported: {weather_interval}")
+
+        self._arrays = {}
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta["weather_interval"] != str(self.weather_interval):
+                raise ValueError(
+                    f"Store at {path} holds {meta['weather_interval']} weather, not {self.weather_interval}"
+                )
+            self.origin = (
+                datetime.datetime.fromisoformat(meta["origin"])
+                if meta["origin"]
+                else None
+            )
+            self.n_times = meta["n_times"]
+            self.locations = [tuple(location) for location in meta["locations"]]
+            self.variables = meta["variables"]
+            self._capacity = tuple(meta["capacity"])
+        else:
+            self.origin = None
+            self.n_times = 0
+            self.locations = []
+            self.variables = []
+            self._capacity = (0, 0)
+        self._rows = {location: row for row, location in enumerate(self.locations)}
+
+    @property
+    def steps_per_day(self):
+        """Return the number of time steps in a day."""
+        return STEPS_PER_DAY[self.weather_interval]
+
+    @property
+    def step(self):
+        """Return the length of one time step."""
+        return datetime.timedelta(days=1) / self.steps_per_day
+
+    def _save_meta(self):
+        meta = {
+            "weather_interval": str(self.weather_interval),
+            "origin": self.origin.isoformat() if self.origin else None,
+            "n_times": self.n_times,
+            "locations": self.locations,
+            "variables": self.variables,
+            "capacity": self._capacity,
+        }
+        tmp_path = self.path / "meta.json.tmp"
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.path / "meta.json")
+
+    def _files(self, variable):
+        return self.path / f"{variable}.npy", self.path / f"{variable}.present.npy"
+
+    def _open(self, variable):
+        if variable not in self._arrays:
+            values_path, present_path = self._files(variable)
+            self._arrays[variable] = (
+                np.load(values_path, mmap_mode="r+"),
+                np.load(present_path, mmap_mode="r+"),
+            )
+        return self._arrays[variable]
+
+    def _allocate(self, variable, capacity, offset=0, copy=True):
+        """Create the arrays of a variable at ``capacity``, moving any existing data ``offset`` steps later."""
+        old = self._open(variable) if copy else None
+        self._arrays.pop(variable, None)
+
+        rows = len(self.locations)
+        for path, dtype, fill, index in zip(
+            self._files(variable), (np.float64, np.bool_), (np.nan, False), (0, 1)
+        ):
+            tmp_path = path.with_suffix(".tmp")
+            array = open_memmap(tmp_path, mode="w+", dtype=dtype, shape=capacity)
+            array[:] = fill
+            if old is not None:
+                array[:rows, offset : offset + self.n_times] = old[index][
+                    :rows, : self.n_times
+                ]
+            array.flush()
+            del array
+            os.replace(tmp_path, path)
+
+    def _ensure(self, n_locations, first_time, last_time):
+        """Grow the arrays to hold ``n_locations`` rows and the times from ``first_time`` to ``last_time``."""
+        first_day = datetime.datetime.combine(first_time.date(), datetime.time())
+        if self.origin is None:
+            self.origin = first_day
+        offset = 0
+        if first_day < self.origin:
+            offset = (self.origin - first_day) // self.step
+        n_times = max(
+            self.n_times + offset,
+            (last_time - min(first_day, self.origin)) // self.step + 1,
+        )
+
+        needed = (n_locations, n_times)
+        if offset or any(n > c for n, c in zip(needed, self._capacity)):
+            capacity = tuple(
+                max(n, 2 * c) if n > c else c for n, c in zip(needed, self._capacity)
+            )
+            for variable in self.variables:
+                self._allocate(variable, capacity, offset)
+            self._capacity = capacity
+        self.origin = min(first_day, self.origin)
+        self.n_times = n_times
+
+    def _day_index(self, day):
+        day = datetime.datetime.strptime(day, DATE_FORMAT)
+        return (day - self.origin).days
+
+    def write(self, weather_df):
+        """
+        Store a weather DataFrame, as returned by ``sentera.api.get_weather``, overwriting any overlapping cells.
+
+        :param weather_df: Pandas DataFrame keyed by *lat*, *long* and the time column of the store's interval
+        """
+        time_column = TIME_COLUMNS[self.weather_interval]
+        if weather_df.empty:
+            return
+        times = pd.to_datetime(weather_df[time_column])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert(None)
+
+        new_locations = pd.unique(
+            pd.Series(list(zip(weather_df["lat"], weather_df["long"])))
+        )
+        new_locations = [
+            location for location in new_locations if location not in self._rows
+        ]
+        new_variables = [
+            column
+            for column in weather_df.columns
+            if column not in (time_column, "lat", "long")
+            and column not in self.variables
+        ]
+
+        self._ensure(len(self.locations) + len(new_locations), times.min(), times.max())
+        for location in new_locations:
+            self._rows[location] = len(self.locations)
+            self.locations.append(location)
+        for variable in new_variables:
+            self._allocate(variable, self._capacity, copy=False)
+            self.variables.append(variable)
+
+        rows = np.fromiter(
+            (
+                self._rows[location]
+                for location in zip(weather_df["lat"], weather_df["long"])
+            ),
+            dtype=np.int64,
+            count=len(weather_df),
+        )
+        columns = ((times - self.origin) // self.step).to_numpy(dtype=np.int64)
+        for variable in weather_df.columns:
+            if variable in (time_column, "lat", "long"):
+                continue
+            values, present = self._open(variable)
+            values[rows, columns] = pd.to_numeric(
+                weather_df[variable], errors="coerce"
+            ).to_numpy(dtype=np.float64)
+            present[rows, columns] = True
+            values.flush()
+            present.flush()
+        self._save_meta()
+
+    def array(self, variable):
+        """
+        Return the memory mapped (*location*, *time*) array of a variable, without copying it.
+
+        Rows follow ``locations`` and column *i* holds the value at ``origin + i * step``. Cells that were never
+        fetched are NaN.
+
+        :param variable: Weather variable, as a string or an instance of the ``sentera.weather.WeatherVariable`` Enum
+        :return: **values** - read only numpy memmap
+        """
+        values = self._open(str(variable))[0][: len(self.locations), : self.n_times]
+        values = values.view()
+        values.flags.writeable = False
+        return values
+
+    def missing(self, requests, weather_variables):
+        """
+        Return the parts of the requested ranges that have not been stored yet for every variable.
+
+        :param requests: Iterable of (*lat*, *long*, *day_start*, *day_end*) with days in **YYYY/MM/DD** format
+        :param weather_variables: Variables that must be present, as strings or ``sentera.weather.WeatherVariable``
+        :return: **missing** - list of (*lat*, *long*, *day_start*, *day_end*), one per contiguous missing range
+        """
+        weather_variables = [str(WeatherVariable(v)) for v in weather_variables]
+        missing = []
+        for lat, long, start, end in requests:
+            row = self._rows.get((lat, long))
+            if (
+                row is None
+                or self.origin is None
+                or any(v not in self.variables for v in weather_variables)
+            ):
+                missing.append((lat, long, start, end))
+                continue
+
+            first_day, last_day = self._day_index(start), self._day_index(end)
+            days = np.arange(first_day, last_day + 1)
+            stored = np.ones(len(days), dtype=bool)
+            n_days = self.n_times // self.steps_per_day
+            inside = (days >= 0) & (days < n_days)
+            stored &= inside
+            for variable in weather_variables:
+                present = self._open(variable)[1][
+                    row, : n_days * self.steps_per_day
+                ].reshape(n_days, self.steps_per_day)
+                stored[inside] &= present[days[inside]].all(axis=1)
+
+            # Boundaries of the runs of missing days
+            edges = np.diff(np.concatenate(([0], (~stored).astype(np.int8), [0])))
+            for run_start, run_end in zip(
+                np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            ):
+                missing.append(
+                    (
+                        lat,
+                        long,
+                        (
+                            self.origin + datetime.timedelta(days=int(days[run_start]))
+                        ).strftime(DATE_FORMAT),
+                        (
+                            self.origin
+                            + datetime.timedelta(days=int(days[run_end - 1]))
+                        ).strftime(DATE_FORMAT),
+                    )
+                )
+        return missing
+
+    def read(self, requests, weather_variables=None):
+        """
+        Return the stored weather of the requested ranges, in the same layout as ``sentera.api.get_weather``.
+
+        Daily *validDate* values are returned as **YYYY-MM-DD** strings and hourly *validTime* values as timestamps.
+        Only time steps fetched for at least one of the returned variables are included.
+
+        :param requests: Iterable of (*lat*, *long*, *day_start*, *day_end*) with days in **YYYY/MM/DD** format
+        :param weather_variables: (optional) Variables to return. Defaults to every stored variable.
+        :return: **weather_df** - Pandas DataFrame
+        """
+        time_column = TIME_COLUMNS[self.weather_interval]
+        if weather_variables is None:
+            weather_variables = list(self.variables)
+        else:
+            weather_variables = [
+                str(WeatherVariable(v))
+                for v in weather_variables
+                if str(WeatherVariable(v)) in self.variables
+            ]
+
+        rows = []
+        columns = []
+        lats = []
+        longs = []
+        for lat, long, start, end in requests:
+            row = self._rows.get((lat, long))
+            if row is None or self.origin is None:
+                continue
+            first = max(self._day_index(start) * self.steps_per_day, 0)
+            last = min((self._day_index(end) + 1) * self.steps_per_day, self.n_times)
+            if first >= last:
+                continue
+            selected = np.arange(first, last)
+            if weather_variables:
+                fetched = np.zeros(len(selected), dtype=bool)
+                for variable in weather_variables:
+                    fetched |= self._open(variable)[1][row, first:last]
+                selected = selected[fetched]
+            rows.append(np.full(len(selected), row))
+            columns.append(selected)
+            lats.append(np.full(len(selected), lat, dtype=np.float64))
+            longs.append(np.full(len(selected), long, dtype=np.float64))
+
+        if not rows:
+            return pd.DataFrame(
+                columns=[time_column, "lat", "long"] + weather_variables
+            )
+        rows = np.concatenate(rows)
+        columns = np.concatenate(columns)
+        times = pd.Timestamp(self.origin) + pd.to_timedelta(
+            columns * (86400 // self.steps_per_day), unit="s"
+        )
+        if self.weather_interval == WeatherInterval.Daily:
+            times = times.strftime("%Y-%m-%d")
+        weather_df = pd.DataFrame(
+            {
+                time_column: times,
+                "lat": np.concatenate(lats),
+                "long": np.concatenate(longs),
+            }
+        )
+        for variable in weather_variables:
+            weather_df[variable] = self._open(variable)[0][rows, columns]
+        return weather_df
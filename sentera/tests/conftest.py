@@ -1,6 +1,14 @@
 import pytest
+import tenacity
+
+from .. import weather
 
 
 @pytest.fixture(autouse=True)
 def set_test_env(monkeypatch):
     monkeypatch.setenv("SENTERA_ENV", "test")
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch):
+    monkeypatch.setattr(weather._fetch.retry, "wait", tenacity.wait_none())
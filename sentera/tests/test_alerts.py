@@ -0,0 +1,24 @@
+from ..alerts import AlertIndex
+
+
+def test_alert_index_round_trip(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    content_hash = AlertIndex.content_hash("Rust", "Corn rust risk", details={"a": 1})
+
+    with AlertIndex(path) as index:
+        assert index.get("field1", "corn_rust") is None
+        index.record("field1", "corn_rust", content_hash)
+
+    with AlertIndex(path) as index:
+        assert len(index) == 1
+        assert index.get("field1", "corn_rust") == content_hash
+        assert index.get("field2", "corn_rust") is None
+
+
+def test_content_hash_changes_with_content():
+    assert AlertIndex.content_hash(
+        "Rust", "msg", details={"a": 1, "b": 2}
+    ) == AlertIndex.content_hash("Rust", "msg", details={"b": 2, "a": 1})
+    assert AlertIndex.content_hash("Rust", "msg") != AlertIndex.content_hash(
+        "Rust", "new msg"
+    )
@@ -1,6 +1,11 @@
+import asyncio
+import contextlib
+import datetime
 import json
 import pathlib
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import httpretty
 import pandas as pd
@@ -10,7 +15,17 @@ import tenacity
 from pandas import json_normalize
 from pandas._testing import assert_frame_equal
 
-from ..api import create_alert, get_fields_within_bounds, get_weather
+from .. import weather
+from ..api import (
+    create_alert,
+    get_all_fields,
+    get_fields_within_bounds,
+    get_weather,
+    get_weather_for_fields_within_bounds,
+    upsert_alerts,
+)
+from ..store import WeatherStore
+from ..transport import ReplayResponse
 
 TOKEN = "aaa"
 
@@ -250,3 +265,533 @@ def test_empty_dataframe():
     )
     response = get_fields_within_bounds(TOKEN, 0, 0, 0, 0)
     assert_frame_equal(response, fields_df)
+
+
+def _capture_run_queries(monkeypatch):
+    calls = {}
+
+    async def fake_run_queries(
+        url_list, weather_variable_list, time_interval_list, *args, **kwargs
+    ):
+        calls["url_list"] = url_list
+        calls["time_interval_list"] = time_interval_list
+        return pd.DataFrame()
+
+    monkeypatch.setattr(weather, "run_queries", fake_run_queries)
+    return calls
+
+
+def test_get_weather_per_location_intervals(monkeypatch):
+    calls = _capture_run_queries(monkeypatch)
+    today = datetime.date.today()
+    first = [
+        (today - datetime.timedelta(days=100)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=95)).strftime("%Y/%m/%d"),
+    ]
+    second = [
+        (today - datetime.timedelta(days=30)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=20)).strftime("%Y/%m/%d"),
+    ]
+    locations = pd.DataFrame(
+        {
+            "lat": [10, 20],
+            "long": [-90, -80],
+            "start": [first[0], second[0]],
+            "end": [first[1], second[1]],
+        }
+    )
+
+    get_weather("recent", locations, ["temperature"], "hourly")
+
+    assert calls["url_list"] == [
+        "https://weathertest.sentera.com/recent/hourly-temperature/10/-90",
+        "https://weathertest.sentera.com/recent/hourly-temperature/20/-80",
+        "https://weathertest.sentera.com/recent/hourly-temperature/20/-80",
+    ]
+    assert calls["time_interval_list"][0] == first
+    assert calls["time_interval_list"][1][0] == second[0]
+    assert calls["time_interval_list"][2][1] == second[1]
+
+
+def test_get_weather_mixed_location_intervals(monkeypatch):
+    calls = _capture_run_queries(monkeypatch)
+    today = datetime.date.today()
+    default = [
+        (today - datetime.timedelta(days=10)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=8)).strftime("%Y/%m/%d"),
+    ]
+    own = [
+        (today - datetime.timedelta(days=3)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=1)).strftime("%Y/%m/%d"),
+    ]
+
+    get_weather(
+        "recent",
+        [(10, -90), (20, -80, own[0], own[1])],
+        ["high-temperature"],
+        "daily",
+        default,
+    )
+
+    assert calls["time_interval_list"] == [default, own]
+
+
+def test_get_weather_missing_location_intervals(monkeypatch):
+    calls = _capture_run_queries(monkeypatch)
+    today = datetime.date.today()
+    default = [
+        (today - datetime.timedelta(days=10)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=8)).strftime("%Y/%m/%d"),
+    ]
+    own = [
+        (today - datetime.timedelta(days=3)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=1)).strftime("%Y/%m/%d"),
+    ]
+    locations = pd.DataFrame(
+        {
+            "lat": [10, 20, 30],
+            "long": [-90, -80, -70],
+            "start": [None, own[0], float("nan")],
+            "end": [None, own[1], float("nan")],
+        }
+    )
+
+    get_weather("recent", locations, ["high-temperature"], "daily", default)
+
+    assert calls["time_interval_list"] == [default, own, default]
+
+
+def test_get_all_fields_projection_and_page_size():
+    pages = [
+        {
+            "total_count": 3,
+            "page": 1,
+            "page_size": 2,
+            "results": [{"sentera_id": "a"}, {"sentera_id": "b"}],
+        },
+        {"total_count": 3, "page": 2, "page_size": 2, "results": [{"sentera_id": "c"}]},
+    ]
+
+    def response_callback(request, context):
+        body = request.json()
+        assert "page_size: 2" in body["query"]
+        assert (
+            "results {\n                        sentera_id\n                    }"
+            in body["query"]
+        )
+        assert request.headers["Accept-Encoding"] == "gzip"
+        return {"data": {"fields": pages[body["variables"]["page"] - 1]}}
+
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", json=response_callback)
+        response = get_all_fields(TOKEN, projection=["sentera_id"], page_size=2)
+
+    assert response["sentera_id"].tolist() == ["a", "b", "c"]
+    assert list(response.columns) == ["sentera_id"]
+
+
+def test_get_weather_derive_daily(monkeypatch):
+    async def fake_run_queries(*args, **kwargs):
+        return pd.DataFrame(
+            {
+                "validTime": ["2021-05-01T00:00:00Z", "2021-05-01T12:00:00Z"],
+                "lat": [10.0, 10.0],
+                "long": [-90.0, -90.0],
+                "temperature": [10.0, 20.0],
+            }
+        )
+
+    monkeypatch.setattr(weather, "run_queries", fake_run_queries)
+    today = datetime.date.today()
+    time_interval = [
+        (today - datetime.timedelta(days=2)).strftime("%Y/%m/%d"),
+        today.strftime("%Y/%m/%d"),
+    ]
+
+    hourly_df, daily_df = get_weather(
+        "recent",
+        [[10, -90]],
+        ["temperature"],
+        "hourly",
+        time_interval,
+        derive_daily=True,
+    )
+    assert len(hourly_df) == 2
+    assert daily_df["high-temperature"].tolist() == [20.0]
+
+    with pytest.raises(ValueError):
+        get_weather("seven-day-forecast", [[10, -90]], derive_daily=True)
+
+
+def test_get_weather_with_store(monkeypatch, tmp_path):
+    calls = []
+    today = datetime.date.today()
+    days = [today - datetime.timedelta(days=i) for i in (3, 2, 1)]
+
+    async def fake_run_queries(
+        url_list, weather_variable_list, time_interval_list, *args, **kwargs
+    ):
+        calls.append(time_interval_list)
+        return pd.DataFrame(
+            {
+                "validDate": [day.strftime("%Y-%m-%d") for day in days],
+                "lat": [10.0] * 3,
+                "long": [-90.0] * 3,
+                "precipitation": [1.0, 2.0, 3.0],
+            }
+        )
+
+    monkeypatch.setattr(weather, "run_queries", fake_run_queries)
+    time_interval = [days[0].strftime("%Y/%m/%d"), days[-1].strftime("%Y/%m/%d")]
+    store = WeatherStore(tmp_path, "daily")
+
+    weather_df = get_weather(
+        "recent", [[10, -90]], ["precipitation"], "daily", time_interval, store=store
+    )
+    assert weather_df["precipitation"].tolist() == [1.0, 2.0, 3.0]
+    assert calls[-1] == [time_interval]
+
+    weather_df = get_weather(
+        "recent",
+        [[10, -90]],
+        ["precipitation"],
+        "daily",
+        time_interval[:1] * 2,
+        store=store,
+    )
+    assert weather_df["precipitation"].tolist() == [1.0]
+    assert calls[-1] == []
+
+    # Rows without their own range fall back to time_interval
+    locations = pd.DataFrame(
+        {"lat": [10], "long": [-90], "start": [float("nan")], "end": [None]}
+    )
+    weather_df = get_weather(
+        "recent", locations, ["precipitation"], "daily", time_interval, store=store
+    )
+    assert weather_df["precipitation"].tolist() == [1.0, 2.0, 3.0]
+    assert calls[-1] == []
+
+
+class EchoingSession:
+    """Answers daily series requests with one record per day, echoing a slightly rounded location."""
+
+    def __init__(self):
+        self.closed = False
+        self.requests = 0
+
+    @contextlib.asynccontextmanager
+    async def get(self, url, params=None, headers=None, raise_for_status=False):
+        self.requests += 1
+        start, end = (
+            datetime.datetime.strptime(params[key], "%Y/%m/%d")
+            for key in ("start", "end")
+        )
+        lat, long = url.rstrip("/").rsplit("/", 2)[-2:]
+        body = {
+            "latitude": round(float(lat), 1) + 1e-9,
+            "longitude": round(float(long), 1),
+            "series": [
+                {
+                    "validDate": (start + datetime.timedelta(days=i)).strftime(
+                        "%Y-%m-%d"
+                    ),
+                    "value": 1.0,
+                    "products": [],
+                }
+                for i in range((end - start).days + 1)
+            ],
+        }
+        yield ReplayResponse(url, 200, json.dumps(body).encode())
+
+
+def test_get_weather_with_store_keys_requested_locations(monkeypatch, tmp_path):
+    monkeypatch.setenv("DISABLE_TQDM", "true")
+    today = datetime.date.today()
+    time_interval = [
+        (today - datetime.timedelta(days=3)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=1)).strftime("%Y/%m/%d"),
+    ]
+    store = WeatherStore(tmp_path, "daily")
+    session = EchoingSession()
+
+    for _ in range(2):
+        weather_df = get_weather(
+            "recent",
+            [["10.25", "-90.25"]],
+            ["precipitation"],
+            "daily",
+            time_interval,
+            store=store,
+            transport=session,
+        )
+        assert weather_df["lat"].tolist() == [10.25] * 3
+        assert weather_df["long"].tolist() == [-90.25] * 3
+        assert weather_df["precipitation"].tolist() == [1.0] * 3
+    assert store.locations == [(10.25, -90.25)]
+    assert session.requests == 1
+
+
+def test_get_weather_for_fields_within_bounds(monkeypatch):
+    pages = [
+        {
+            "total_count": 3,
+            "page": 1,
+            "page_size": 2,
+            "results": [
+                {"sentera_id": "a", "latitude": 10.0, "longitude": -90.0},
+                {"sentera_id": "b", "latitude": 20.0, "longitude": -80.0},
+            ],
+        },
+        {
+            "total_count": 3,
+            "page": 2,
+            "page_size": 2,
+            "results": [{"sentera_id": "c", "latitude": 10.0, "longitude": -90.0}],
+        },
+    ]
+    fetched = []
+
+    async def fake_fetch(url, session, weather_variable, *args):
+        fetched.append(url)
+        return json.dumps({"temperature": len(fetched)}).encode(), weather_variable, url
+
+    def response_callback(request, context):
+        body = request.json()
+        assert "page_size: 2" in body["query"]
+        return {"data": {"fields": pages[body["variables"]["page"] - 1]}}
+
+    monkeypatch.setattr(weather, "_fetch", fake_fetch)
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", json=response_callback)
+        weather_df = get_weather_for_fields_within_bounds(
+            TOKEN, 0, -100, 30, -70, "seven-day-forecast", page_size=2
+        )
+
+    assert sorted(fetched) == [
+        "https://weathertest.sentera.com/seven-day-forecast/10.0/-90.0",
+        "https://weathertest.sentera.com/seven-day-forecast/20.0/-80.0",
+    ]
+    weather_df = weather_df.sort_values("sentera_id").reset_index(drop=True)
+    assert weather_df["sentera_id"].tolist() == ["a", "b", "c"]
+    assert weather_df["lat"].tolist() == [10.0, 20.0, 10.0]
+    assert weather_df["temperature"].iloc[0] == weather_df["temperature"].iloc[2]
+
+
+def test_get_weather_for_fields_within_bounds_recent(monkeypatch):
+    monkeypatch.setenv("DISABLE_TQDM", "true")
+    fields = {
+        "total_count": 3,
+        "page": 1,
+        "page_size": 3,
+        "results": [
+            {"sentera_id": "a", "latitude": 10.25, "longitude": -90.25},
+            {"sentera_id": "b", "latitude": 20.333333, "longitude": -80.0},
+            {"sentera_id": "c", "latitude": 10.25, "longitude": -90.25},
+        ],
+    }
+    today = datetime.date.today()
+    time_interval = [
+        (today - datetime.timedelta(days=2)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=1)).strftime("%Y/%m/%d"),
+    ]
+    session = EchoingSession()
+
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", json={"data": {"fields": fields}})
+        weather_df = get_weather_for_fields_within_bounds(
+            TOKEN,
+            0,
+            -100,
+            30,
+            -70,
+            "recent",
+            ["precipitation"],
+            "daily",
+            time_interval,
+            transport=session,
+        )
+
+    assert session.requests == 2
+    weather_df = weather_df.sort_values(["sentera_id", "validDate"])
+    assert weather_df["sentera_id"].tolist() == ["a", "a", "b", "b", "c", "c"]
+    assert (
+        weather_df["lat"].tolist() == [10.25, 10.25, 20.333333, 20.333333] + [10.25] * 2
+    )
+    assert weather_df["precipitation"].tolist() == [1.0] * 6
+
+
+def test_upsert_alerts_skips_unchanged(tmp_path):
+    alerts = [
+        {"field_sentera_id": "f1", "name": "Rust", "message": "a", "key": "rust"},
+        {"field_sentera_id": "f2", "name": "Rust", "message": "b", "key": "rust"},
+    ]
+    index_path = str(tmp_path / "alerts.db")
+    sent = []
+
+    def response_callback(request, context):
+        variables = request.json()["variables"]
+        sent.append((variables["field_sentera_id"], variables["message"]))
+        return {"data": {"create_alert": {"key": variables["key"]}}}
+
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", json=response_callback)
+        first = upsert_alerts(alerts, TOKEN, index_path)
+        alerts[1]["message"] = "changed"
+        second = upsert_alerts(pd.DataFrame(alerts), TOKEN, index_path)
+
+    assert sent == [("f1", "a"), ("f2", "b"), ("f2", "changed")]
+    assert all(result is not None for result in first)
+    assert second[0] is None
+    assert second[1]["data"]["create_alert"]["key"] == "rust"
+
+
+def test_upsert_alerts_dataframe_missing_values(tmp_path):
+    alerts = pd.DataFrame(
+        [
+            {"field_sentera_id": "f1", "name": "Rust", "message": "a", "key": "rust"},
+            {
+                "field_sentera_id": "f2",
+                "name": "Rust",
+                "message": "b",
+                "key": "rust",
+                "url": "https://example.com",
+                "details": {"severity": "high"},
+            },
+        ]
+    )
+    index_path = str(tmp_path / "alerts.db")
+    sent = []
+
+    def response_callback(request, context):
+        sent.append(json.loads(request.body)["variables"])
+        return {"data": {"create_alert": {"key": "rust"}}}
+
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", json=response_callback)
+        upsert_alerts(alerts, TOKEN, index_path)
+        results = upsert_alerts(
+            [
+                {
+                    "field_sentera_id": "f1",
+                    "name": "Rust",
+                    "message": "a",
+                    "key": "rust",
+                }
+            ],
+            TOKEN,
+            index_path,
+        )
+
+    assert sent[0]["url"] is None
+    assert sent[0]["details"] is None
+    assert sent[1]["url"] == "https://example.com"
+    assert results == [None]
+
+    with pytest.raises(ValueError):
+        upsert_alerts(
+            pd.DataFrame(
+                [
+                    {"field_sentera_id": "f1", "name": "Rust", "message": "a"},
+                    {
+                        "field_sentera_id": "f2",
+                        "name": "Rust",
+                        "message": "b",
+                        "key": "k",
+                    },
+                ]
+            ),
+            TOKEN,
+            index_path,
+        )
+
+
+def test_upsert_alerts_requires_key(tmp_path):
+    with pytest.raises(ValueError):
+        upsert_alerts(
+            [{"field_sentera_id": "f1", "name": "Rust", "message": "a"}],
+            TOKEN,
+            str(tmp_path / "alerts.db"),
+        )
+
+
+def test_get_weather_from_many_threads(monkeypatch):
+    sessions = []
+
+    async def fake_run_queries(*args, session=None, **kwargs):
+        sessions.append((session, threading.current_thread().name))
+        await asyncio.sleep(0.01)
+        return pd.DataFrame()
+
+    monkeypatch.setattr(weather, "run_queries", fake_run_queries)
+    interval = [
+        (datetime.date.today() - datetime.timedelta(days=3)).strftime("%Y/%m/%d"),
+        datetime.date.today().strftime("%Y/%m/%d"),
+    ]
+
+    def call(lat):
+        return get_weather("recent", [[lat, -90]], ["temperature"], "hourly", interval)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(call, range(8)))
+
+    assert all(result.empty for result in results)
+    assert len({id(session) for session, _ in sessions}) == 1
+    assert {name for _, name in sessions} == {"sentera-loop"}
+
+
+def test_get_all_fields_revalidates_cached_pages(tmp_path):
+    page = {
+        "total_count": 1,
+        "page": 1,
+        "page_size": 1000,
+        "results": [{"sentera_id": "a"}],
+    }
+    conditional = []
+
+    def response_callback(request, context):
+        conditional.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            context.status_code = 304
+            return ""
+        context.headers["ETag"] = '"v1"'
+        return json.dumps({"data": {"fields": page}})
+
+    cache = str(tmp_path / "cache.db")
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", text=response_callback)
+        first = get_all_fields(TOKEN, projection=["sentera_id"], cache=cache)
+        second = get_all_fields(TOKEN, projection=["sentera_id"], cache=cache)
+
+    assert conditional == [None, '"v1"']
+    assert_frame_equal(first, second)
+
+
+@pytest.mark.parametrize("backend", ["arrow", "polars"])
+def test_get_all_fields_backends(backend):
+    pytest.importorskip("pyarrow")
+    if backend == "polars":
+        pytest.importorskip("polars")
+    pages = [
+        {
+            "total_count": 3,
+            "page": 1,
+            "page_size": 2,
+            "results": [{"sentera_id": "a"}, {"sentera_id": "b"}],
+        },
+        {"total_count": 3, "page": 2, "page_size": 2, "results": [{"sentera_id": "c"}]},
+    ]
+
+    def response_callback(request, context):
+        return {"data": {"fields": pages[request.json()["variables"]["page"] - 1]}}
+
+    with requests_mock.Mocker() as m:
+        m.post("https://apitest.sentera.com/graphql", json=response_callback)
+        fields = get_all_fields(
+            TOKEN, projection=["sentera_id"], page_size=2, backend=backend
+        )
+
+    if backend == "arrow":
+        assert fields.column("sentera_id").to_pylist() == ["a", "b", "c"]
+    else:
+        assert fields["sentera_id"].to_list() == ["a", "b", "c"]
@@ -0,0 +1,48 @@
+import pytest
+
+from ..backends import join_variables, records_table
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_records_table_flattens_nested_records():
+    table = records_table(
+        [{"sentera_id": "a", "crop": {"name": "corn"}}, {"sentera_id": "b"}]
+    )
+
+    assert table.column_names == ["sentera_id", "crop.name"]
+    assert table.column("crop.name").to_pylist() == ["corn", None]
+
+
+def test_join_variables():
+    keys = ["validDate", "lat", "long"]
+
+    def table(variable, days, values):
+        return pa.table(
+            {
+                "validDate": days,
+                variable: values,
+                "lat": [1.0] * len(days),
+                "long": [2.0] * len(days),
+            }
+        )
+
+    joined = join_variables(
+        [
+            table("precipitation", ["2021-05-02"], [0.5]),
+            table("high-temperature", ["2021-05-01"], [20.0]),
+            table("precipitation", ["2021-05-01"], [0.0]),
+        ],
+        keys,
+    )
+
+    assert joined.column("validDate").to_pylist() == ["2021-05-01", "2021-05-02"]
+    assert joined.column("precipitation").to_pylist() == [0.0, 0.5]
+    assert joined.column("high-temperature").to_pylist() == [20.0, None]
+
+
+def test_join_variables_empty():
+    joined = join_variables([], ["validTime", "lat", "long"])
+
+    assert joined.num_rows == 0
+    assert joined.column_names == ["validTime", "lat", "long"]
@@ -0,0 +1,27 @@
+from ..cache import ResponseCache
+
+
+def test_cache_round_trip(tmp_path):
+    path = str(tmp_path / "cache.db")
+    params = {"start": "2021/01/01"}
+
+    with ResponseCache(path) as cache:
+        assert cache.get("https://example.com/a", params) is None
+        assert cache.conditional_headers(None) == {}
+        cache.put("https://example.com/a", params, b"{}", etag='"v1"')
+
+    with ResponseCache(path) as cache:
+        cached = cache.get("https://example.com/a", params)
+        assert cached == (b"{}", '"v1"', None)
+        assert cache.conditional_headers(cached) == {"If-None-Match": '"v1"'}
+
+
+def test_cache_drops_responses_without_validators(tmp_path):
+    with ResponseCache(str(tmp_path / "cache.db")) as cache:
+        cache.put("u", {}, b"old", last_modified="Mon, 03 May 2021 00:00:00 GMT")
+        assert cache.conditional_headers(cache.get("u", {})) == {
+            "If-Modified-Since": "Mon, 03 May 2021 00:00:00 GMT"
+        }
+        cache.put("u", {}, b"new")
+        assert cache.get("u", {}) is None
+        assert len(cache) == 0
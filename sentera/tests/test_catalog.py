@@ -0,0 +1,64 @@
+import pandas as pd
+
+from .. import api
+from ..catalog import FieldCatalog
+
+FIELDS = pd.DataFrame(
+    {
+        "sentera_id": ["a", "b", "c", "d"],
+        "name": ["A", "B", "C", "D"],
+        "latitude": [42.70, 42.75, 43.50, -10.0],
+        "longitude": [-95.60, -95.65, -96.00, 20.0],
+    }
+)
+
+
+def test_within_bounds():
+    catalog = FieldCatalog("token")
+    assert catalog.update(FIELDS) == 4
+
+    fields_df = catalog.within_bounds(42.6, -95.7, 42.8, -95.5)
+    assert sorted(fields_df["sentera_id"]) == ["a", "b"]
+    assert catalog.within_bounds(0, 0, 1, 1).empty
+    assert sorted(catalog.ids_within_bounds(-90, -180, 90, 180)) == [
+        "a",
+        "b",
+        "c",
+        "d",
+    ]
+
+
+def test_nearest():
+    catalog = FieldCatalog("token")
+    catalog.update(FIELDS)
+
+    fields_df = catalog.nearest(42.74, -95.64, k=2)
+    assert fields_df["sentera_id"].tolist() == ["b", "a"]
+    assert fields_df["distance"].is_monotonic_increasing
+
+    assert catalog.nearest(-9, 21)["sentera_id"].tolist() == ["d"]
+    assert FieldCatalog("token").nearest(0, 0).empty
+
+
+def test_update_reindexes_only_changed_fields():
+    catalog = FieldCatalog("token")
+    catalog.update(FIELDS)
+    assert catalog.update(FIELDS) == 0
+
+    moved = FIELDS.copy()
+    moved.loc[0, ["latitude", "longitude"]] = [-10.1, 20.1]
+    assert catalog.update(moved) == 1
+    assert sorted(catalog.within_bounds(-11, 19, -9, 21)["sentera_id"]) == ["a", "d"]
+
+
+def test_sync(monkeypatch):
+    responses = [FIELDS, FIELDS.iloc[1:]]
+    monkeypatch.setattr(api, "get_all_fields", lambda token, **kwargs: responses.pop(0))
+
+    catalog = FieldCatalog("token")
+    assert catalog.sync() == 4
+    assert catalog.sync() == 1
+    assert len(catalog) == 3
+    assert catalog.within_bounds(42.6, -95.7, 42.8, -95.5)["sentera_id"].tolist() == [
+        "b"
+    ]
@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ..checkpoint import Checkpoint
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoint.db")
+    params = {"start": "2021/01/01", "end": "2021/01/05"}
+
+    with Checkpoint(path) as checkpoint:
+        assert checkpoint.get("https://example.com/a", params) is None
+        checkpoint.put("https://example.com/a", params, b'{"series": []}')
+
+    with Checkpoint(path) as checkpoint:
+        assert len(checkpoint) == 1
+        assert checkpoint.get("https://example.com/a", params) == b'{"series": []}'
+        assert checkpoint.get("https://example.com/a", {"start": "x"}) is None
+
+
+def test_request_key_ignores_param_order():
+    assert Checkpoint.request_key("u", {"a": 1, "b": 2}) == Checkpoint.request_key(
+        "u", {"b": 2, "a": 1}
+    )
+
+
+def test_checkpoint_used_from_another_thread(tmp_path):
+    with Checkpoint(str(tmp_path / "checkpoint.db")) as checkpoint:
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(checkpoint.put, "u", {}, b"{}").result()
+            assert pool.submit(checkpoint.get, "u", {}).result() == b"{}"
+        assert len(checkpoint) == 1
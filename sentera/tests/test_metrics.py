@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from ..metrics import compute_metrics, growing_degree_days
+
+DAILY = pd.DataFrame(
+    {
+        "validDate": [
+            "2021-05-02",
+            "2021-05-01",
+            "2021-05-03",
+            "2021-05-01",
+            "2021-05-02",
+        ],
+        "lat": [1.0, 1.0, 1.0, 2.0, 2.0],
+        "long": [3.0, 3.0, 3.0, 4.0, 4.0],
+        "high-temperature": [25.0, 20.0, 40.0, 15.0, 12.0],
+        "low-temperature": [12.0, 5.0, 20.0, 8.0, 2.0],
+        "precipitation": [0.0, 1.0, 0.0, 0.0, 0.0],
+        "evapotranspiration-short-crop": [0.5, 0.25, 0.5, 0.1, 0.1],
+    }
+)
+
+
+def test_growing_degree_days():
+    gdd = growing_degree_days(DAILY, base=10.0, cap=30.0)
+    assert gdd.tolist() == [8.5, 5.0, 15.0, 2.5, 1.0]
+
+    hourly = pd.DataFrame({"temperature": [34.0, 5.0, 22.0]})
+    assert growing_degree_days(hourly).tolist() == pytest.approx([20 / 24, 0, 0.5])
+
+
+def test_compute_metrics():
+    metrics_df = compute_metrics(DAILY, rolling_window=2)
+
+    assert metrics_df["validDate"].tolist() == [
+        "2021-05-01",
+        "2021-05-02",
+        "2021-05-03",
+        "2021-05-01",
+        "2021-05-02",
+    ]
+    assert metrics_df["cumulative_gdd"].tolist() == [5.0, 13.5, 28.5, 2.5, 3.5]
+    assert metrics_df["cumulative_precipitation"].tolist() == [1.0, 1.0, 1.0, 0.0, 0.0]
+    assert metrics_df["rolling_precipitation"].tolist() == [1.0, 1.0, 0.0, 0.0, 0.0]
+    assert metrics_df["dry_spell"].tolist() == [0, 1, 2, 1, 2]
+    assert metrics_df["cumulative_water_balance"].tolist() == pytest.approx(
+        [0.75, 0.25, -0.25, -0.1, -0.2]
+    )
+
+
+def test_compute_metrics_missing_time_column():
+    with pytest.raises(ValueError):
+        compute_metrics(DAILY.drop(columns=["validDate"]))
+
+
+def test_compute_metrics_skips_gdd_without_both_temperatures():
+    metrics_df = compute_metrics(DAILY.drop(columns=["low-temperature"]))
+
+    assert "gdd" not in metrics_df
+    assert "cumulative_precipitation" in metrics_df
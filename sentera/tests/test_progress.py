@@ -0,0 +1,64 @@
+import io
+
+from ..progress import EVENT_KEYS, ProgressReporter, TqdmProgress, progress_callbacks
+
+
+def test_reporter_counts_requests():
+    events = []
+    reporter = ProgressReporter([events.append], total=3, interval=0)
+
+    reporter.plan(3)
+    reporter.send()
+    reporter.receive(100)
+    assert reporter.event()["in_flight"] == 1
+    reporter.release()
+    reporter.complete()
+    reporter.complete(failed=True)
+    reporter.close()
+
+    assert all(list(event) == EVENT_KEYS for event in events)
+    assert [event["finished"] for event in events] == [False, False, False, True]
+    last = events[-1]
+    assert last["planned"] == 3
+    assert last["in_flight"] == 0
+    assert (last["done"], last["failed"]) == (1, 1)
+    assert last["bytes"] == 100
+    assert last["eta"] is not None
+
+
+def test_reporter_rate_limits_events():
+    events = []
+    reporter = ProgressReporter([events.append], interval=3600)
+
+    reporter.plan(1000)
+    for _ in range(1000):
+        reporter.complete()
+    reporter.close()
+
+    assert len(events) == 2
+    assert events[0]["planned"] == 1000
+    assert events[0]["eta"] is None
+    assert events[-1]["done"] == 1000
+    assert events[-1]["finished"]
+
+
+def test_progress_callbacks(monkeypatch):
+    monkeypatch.delenv("DISABLE_TQDM", raising=False)
+    assert [type(callback) for callback in progress_callbacks()] == [TqdmProgress]
+    monkeypatch.setenv("DISABLE_TQDM", "true")
+    assert progress_callbacks() == []
+
+    assert progress_callbacks(print) == [print]
+    assert progress_callbacks([]) == []
+
+
+def test_tqdm_progress():
+    bar = TqdmProgress(file=io.StringIO())
+    reporter = ProgressReporter([bar], interval=0)
+
+    reporter.plan(2)
+    reporter.complete()
+    reporter.complete(failed=True)
+    assert bar._bar.n == 2
+    assert bar._bar.total == 2
+    reporter.close()
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ..runner import BackgroundRunner
+
+
+def test_runner_shares_one_loop_and_session_across_threads():
+    runner = BackgroundRunner()
+
+    async def job(i):
+        await asyncio.sleep(0.01)
+        return i, threading.current_thread().name, id(runner.session)
+
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda i: runner.run(job(i)), range(16)))
+    finally:
+        runner.close()
+
+    assert [i for i, _, _ in results] == list(range(16))
+    assert {name for _, name, _ in results} == {"sentera-loop"}
+    assert len({session for _, _, session in results}) == 1
+
+
+def test_runner_call_runs_on_thread_pool():
+    runner = BackgroundRunner(max_workers=2)
+    try:
+        name = runner.call(lambda: threading.current_thread().name).result()
+    finally:
+        runner.close()
+
+    assert name.startswith("sentera-io")
+
+
+def test_runner_rejects_waiting_from_its_own_loop():
+    runner = BackgroundRunner()
+
+    async def nested():
+        runner.run(asyncio.sleep(0))
+
+    try:
+        with pytest.raises(RuntimeError):
+            runner.run(nested())
+    finally:
+        runner.close()
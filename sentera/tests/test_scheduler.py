@@ -0,0 +1,65 @@
+import asyncio
+
+from ..scheduler import Priority, WeatherScheduler, get_scheduler
+
+
+def test_priority_and_fair_sharing():
+    order = []
+
+    async def request(scheduler, name, priority, job):
+        async with scheduler.slot(priority, job):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def run():
+        scheduler = WeatherScheduler(limit=1)
+        async with scheduler.slot():
+            tasks = [
+                asyncio.ensure_future(request(scheduler, f"a{i}", "batch", "a"))
+                for i in range(3)
+            ]
+            tasks.append(asyncio.ensure_future(request(scheduler, "b0", "batch", "b")))
+            tasks.append(
+                asyncio.ensure_future(
+                    request(scheduler, "i0", Priority.Interactive, "i")
+                )
+            )
+            await asyncio.sleep(0)
+            assert scheduler.waiting() == 5
+            assert scheduler.waiting("interactive") == 1
+        await asyncio.gather(*tasks)
+        assert scheduler.active == 0
+
+    asyncio.run(run())
+    assert order == ["i0", "a0", "b0", "a1", "a2"]
+
+
+def test_limit_and_cancellation():
+    async def run():
+        scheduler = WeatherScheduler(limit=2)
+        in_flight = []
+        peak = []
+
+        async def request():
+            async with scheduler.slot():
+                in_flight.append(1)
+                peak.append(len(in_flight))
+                await asyncio.sleep(0.001)
+                in_flight.pop()
+
+        tasks = [asyncio.ensure_future(request()) for _ in range(10)]
+        await asyncio.sleep(0)
+        tasks[5].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert max(peak) == 2
+        assert len(peak) == 9
+        assert scheduler.active == 0
+
+        scheduler.resize(5)
+        assert scheduler.limit == 5
+
+    asyncio.run(run())
+
+
+def test_get_scheduler_is_shared():
+    assert get_scheduler() is get_scheduler()
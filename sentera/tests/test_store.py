@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..store import WeatherStore
+
+
+def test_write_missing_read(tmp_path):
+    store = WeatherStore(tmp_path, "daily")
+    store.write(
+        pd.DataFrame(
+            {
+                "validDate": ["2021-05-02", "2021-05-03"],
+                "lat": [1.0, 1.0],
+                "long": [2.0, 2.0],
+                "precipitation": [0.1, 0.2],
+            }
+        )
+    )
+
+    assert store.missing(
+        [
+            (1.0, 2.0, "2021/05/01", "2021/05/05"),
+            (3.0, 4.0, "2021/05/01", "2021/05/02"),
+        ],
+        ["precipitation"],
+    ) == [
+        (1.0, 2.0, "2021/05/01", "2021/05/01"),
+        (1.0, 2.0, "2021/05/04", "2021/05/05"),
+        (3.0, 4.0, "2021/05/01", "2021/05/02"),
+    ]
+    assert (
+        store.missing([(1.0, 2.0, "2021/05/02", "2021/05/03")], ["precipitation"]) == []
+    )
+    assert (
+        len(
+            store.missing(
+                [(1.0, 2.0, "2021/05/02", "2021/05/03")], ["high-temperature"]
+            )
+        )
+        == 1
+    )
+
+    weather_df = store.read([(1.0, 2.0, "2021/05/01", "2021/05/02")], ["precipitation"])
+    assert weather_df["validDate"].tolist() == ["2021-05-02"]
+    assert weather_df["precipitation"].tolist() == [0.1]
+
+
+def test_grows_and_reopens(tmp_path):
+    store = WeatherStore(tmp_path, "daily")
+    store.write(
+        pd.DataFrame(
+            {
+                "validDate": ["2021-05-02"],
+                "lat": [1.0],
+                "long": [2.0],
+                "precipitation": [0.1],
+            }
+        )
+    )
+    store.write(
+        pd.DataFrame(
+            {
+                "validDate": ["2021-04-28", "2021-05-05"],
+                "lat": [1.0, 5.0],
+                "long": [2.0, 6.0],
+                "high-temperature": [3.0, 4.0],
+            }
+        )
+    )
+
+    store = WeatherStore(tmp_path, "daily")
+    assert store.locations == [(1.0, 2.0), (5.0, 6.0)]
+    precipitation = store.array("precipitation")
+    assert isinstance(precipitation, np.memmap)
+    assert precipitation.shape == (2, 8)
+    assert precipitation[0, 4] == 0.1
+    assert np.isnan(precipitation[1]).all()
+
+    weather_df = store.read(
+        [(1.0, 2.0, "2021/04/01", "2021/05/31"), (5.0, 6.0, "2021/05/05", "2021/05/05")]
+    )
+    assert weather_df["validDate"].tolist() == [
+        "2021-04-28",
+        "2021-05-02",
+        "2021-05-05",
+    ]
+    assert weather_df["high-temperature"].tolist()[::2] == [3.0, 4.0]
+
+    with pytest.raises(ValueError):
+        WeatherStore(tmp_path, "hourly")
+
+
+def test_hourly_missing_days(tmp_path):
+    store = WeatherStore(tmp_path, "hourly")
+    store.write(
+        pd.DataFrame(
+            {
+                "validTime": pd.date_range(
+                    "2021-05-01", periods=30, freq="h", tz="UTC"
+                ).astype(str),
+                "lat": 1.0,
+                "long": 2.0,
+                "temperature": np.arange(30.0),
+            }
+        )
+    )
+
+    assert store.missing([(1.0, 2.0, "2021/05/01", "2021/05/03")], ["temperature"]) == [
+        (1.0, 2.0, "2021/05/02", "2021/05/03")
+    ]
+    weather_df = store.read([(1.0, 2.0, "2021/05/02", "2021/05/02")])
+    assert weather_df["temperature"].tolist() == [24.0, 25.0, 26.0, 27.0, 28.0, 29.0]
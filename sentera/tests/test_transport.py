@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from .. import weather
+from ..transport import RecordingSession, ReplaySession, ResponseArchive
+from ..weather import WeatherInterval, WeatherType, WeatherVariable
+
+RESPONSE = {
+    "latitude": 44.9,
+    "longitude": -93.2,
+    "series": [
+        {"validDate": "2021-05-01", "value": 51.5, "products": []},
+        {"validDate": "2021-05-02", "value": 48.0, "products": []},
+    ],
+}
+
+
+def _run(session, url_list):
+    return weather.run_queries(
+        url_list,
+        [WeatherVariable.HighTemperature] * len(url_list),
+        [["2021/05/01", "2021/05/02"]] * len(url_list),
+        WeatherInterval.Daily,
+        WeatherType.Historical,
+        session=session,
+        raise_on_error=False,
+    )
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "archive.db")
+
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        if request.match_info["lat"] == "0":
+            return web.Response(status=404, text="not found")
+        return web.json_response(RESPONSE)
+
+    async def record():
+        app = web.Application()
+        app.router.add_get("/historical/{variable}/{lat}/{long}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        urls = [
+            f"http://127.0.0.1:{port}/historical/high-temperature/{lat}/-93.2"
+            for lat in (44.9, 0)
+        ]
+        session = RecordingSession(path)
+        try:
+            return urls, await _run(session, urls)
+        finally:
+            await session.close()
+            await runner.cleanup()
+
+    urls, (recorded_df, recorded_failures) = asyncio.run(record())
+    assert len(ResponseArchive(path)) == 2
+
+    async def replay(**kwargs):
+        session = ReplaySession(path, **kwargs)
+        try:
+            return await _run(session, urls)
+        finally:
+            await session.close()
+
+    started = time.monotonic()
+    replayed_df, replayed_failures = asyncio.run(replay(latency=True))
+    assert time.monotonic() - started >= 0.05
+
+    assert replayed_df.equals(recorded_df)
+    assert replayed_df["high-temperature"].tolist() == [51.5, 48.0]
+    assert replayed_failures["status"].tolist() == [404]
+    assert recorded_failures["status"].tolist() == [404]
+    assert recorded_failures["attempts"].tolist() == [5]
+
+
+def test_replay_unrecorded_request(tmp_path):
+    async def replay():
+        session = ReplaySession(str(tmp_path / "archive.db"))
+        async with session.get("https://example.com", params={}):
+            pass
+
+    with pytest.raises(LookupError):
+        asyncio.run(replay())
+
+
+def test_replay_response_streams_and_raises(tmp_path):
+    with ResponseArchive(str(tmp_path / "archive.db")) as archive:
+        body = json.dumps(RESPONSE).encode()
+        archive.put("https://example.com/a", {"start": "x"}, 200, body, 0.5)
+        archive.put("https://example.com/b", {}, 503, b"unavailable", 0.1)
+
+        async def replay():
+            session = ReplaySession(archive)
+            async with session.get(
+                "https://example.com/a", params={"start": "x"}
+            ) as response:
+                chunks = [chunk async for chunk in response.content.iter_chunked(10)]
+            with pytest.raises(aiohttp.ClientResponseError):
+                async with session.get("https://example.com/b", raise_for_status=True):
+                    pass
+            return b"".join(chunks)
+
+        assert asyncio.run(replay()) == body
+
+
+def test_http2_session_adapts_responses():
+    pytest.importorskip("httpx")
+    from ..transport import Http2Session
+
+    async def handler(request):
+        if request.match_info["lat"] == "0":
+            return web.Response(status=404, text="not found")
+        return web.json_response(RESPONSE)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/historical/{variable}/{lat}/{long}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        urls = [
+            f"http://127.0.0.1:{port}/historical/high-temperature/{lat}/-93.2"
+            for lat in (44.9, 0)
+        ]
+        session = Http2Session()
+        try:
+            return await _run(session, urls)
+        finally:
+            await session.close()
+            await runner.cleanup()
+
+    data_df, failures = asyncio.run(run())
+
+    assert data_df["high-temperature"].tolist() == [51.5, 48.0]
+    assert failures["status"].tolist() == [404]
+    assert failures["attempts"].tolist() == [5]
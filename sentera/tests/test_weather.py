@@ -0,0 +1,710 @@
+import asyncio
+import contextlib
+import datetime
+import json
+
+import aiohttp
+import pandas as pd
+import pytest
+import tenacity
+from aiohttp import web
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .. import weather
+from ..scheduler import WeatherScheduler
+from ..transport import ReplayResponse
+from ..weather import (
+    AdaptiveWindow,
+    WeatherInterval,
+    WeatherType,
+    WeatherVariable,
+    split_time_interval,
+)
+
+
+def _recent_interval(start_days_ago, end_days_ago):
+    today = datetime.date.today()
+    return [
+        (today - datetime.timedelta(days=start_days_ago)).strftime("%Y/%m/%d"),
+        (today - datetime.timedelta(days=end_days_ago)).strftime("%Y/%m/%d"),
+    ]
+
+
+def test_split_time_interval_default_window():
+    intervals = split_time_interval(
+        _recent_interval(20, 0), WeatherType.Recent, WeatherInterval.Hourly
+    )
+    assert len(intervals) == 4
+
+
+def test_split_time_interval_configured_window():
+    time_interval = _recent_interval(700, 0)
+    intervals = split_time_interval(
+        time_interval, WeatherType.Recent, WeatherInterval.Hourly, 350
+    )
+    assert intervals == [
+        [time_interval[0], _recent_interval(350, 0)[0]],
+        [_recent_interval(350, 0)[0], time_interval[1]],
+    ]
+
+
+def test_split_time_interval_adaptive_window():
+    window = AdaptiveWindow(10)
+    intervals = split_time_interval(
+        _recent_interval(20, 0), WeatherType.Recent, WeatherInterval.Hourly, window
+    )
+    assert len(intervals) == 2
+
+
+def test_adaptive_window_grows_and_shrinks():
+    window = AdaptiveWindow(5, target_seconds=1.0, target_bytes=1000)
+    window.observe(5, 0.1, 10)
+    assert window.days == 10
+
+    window = AdaptiveWindow(40, target_seconds=1.0, target_bytes=1000)
+    window.observe(40, 4.0, 100)
+    assert window.days == 10
+
+
+def test_adaptive_window_reject_caps_days():
+    window = AdaptiveWindow(64, target_seconds=100.0, target_bytes=10**9)
+    window.reject(64)
+    assert window.max_days == 63
+    assert window.days == 32
+    for _ in range(5):
+        window.observe(window.days, 0.01, 10)
+    assert window.days == 63
+
+
+def test_adaptive_window_stale_reject_keeps_cap():
+    window = AdaptiveWindow(64, target_seconds=100.0, target_bytes=10**9)
+    window.reject(16)
+    window.reject(64)
+    assert window.max_days == 15
+    assert window.days == 8
+
+
+def test_run_queries_splits_rejected_windows():
+    requested = []
+
+    class WindowLimitedSession:
+        closed = False
+
+        @contextlib.asynccontextmanager
+        async def get(self, url, params=None, headers=None, raise_for_status=False):
+            start, end = (
+                datetime.datetime.strptime(params[key], "%Y/%m/%d")
+                for key in ("start", "end")
+            )
+            requested.append((end - start).days)
+            if (end - start).days > 10:
+                response = ReplayResponse(url, 413, b"window too large")
+            else:
+                series = [
+                    {
+                        "validDate": (start + datetime.timedelta(days=i)).strftime(
+                            "%Y-%m-%d"
+                        ),
+                        "value": 1.0,
+                        "products": [],
+                    }
+                    for i in range((end - start).days + 1)
+                ]
+                body = {"latitude": 10.0, "longitude": -90.0, "series": series}
+                response = ReplayResponse(url, 200, json.dumps(body).encode())
+            if raise_for_status:
+                response.raise_for_status()
+            yield response
+
+    window = AdaptiveWindow(40, target_seconds=100.0, target_bytes=10**9)
+    time_interval = _recent_interval(40, 0)
+    time_intervals = split_time_interval(
+        time_interval, WeatherType.Recent, WeatherInterval.Daily, window
+    )
+    data_df = asyncio.run(
+        weather.run_queries(
+            ["https://weathertest.sentera.com/recent/daily-high-temperature/10/-90"]
+            * len(time_intervals),
+            [WeatherVariable.HighTemperature] * len(time_intervals),
+            time_intervals,
+            WeatherInterval.Daily,
+            WeatherType.Recent,
+            adaptive_window=window,
+            session=WindowLimitedSession(),
+            progress=[],
+        )
+    )
+
+    # Refused windows are halved until the server accepts them
+    assert requested[0] == 40
+    assert set(requested) == {40, 20, 10}
+    assert window.max_days < 20
+    assert len(data_df) == 41
+    assert data_df["high-temperature"].notna().all()
+
+
+def test_run_queries_fails_refusals_unrelated_to_window():
+    requested = []
+
+    class InvalidLocationSession:
+        closed = False
+
+        @contextlib.asynccontextmanager
+        async def get(self, url, params=None, headers=None, raise_for_status=False):
+            requested.append((params["start"], params["end"]))
+            response = ReplayResponse(url, 400, b"invalid location")
+            if raise_for_status:
+                response.raise_for_status()
+            yield response
+
+    window = AdaptiveWindow(365, target_seconds=100.0, target_bytes=10**9)
+    time_interval = _recent_interval(700, 0)
+    time_intervals = split_time_interval(
+        time_interval, WeatherType.Recent, WeatherInterval.Daily, window
+    )
+    data_df, failures = asyncio.run(
+        weather.run_queries(
+            ["https://weathertest.sentera.com/recent/daily-high-temperature/95/-90"]
+            * len(time_intervals),
+            [WeatherVariable.HighTemperature] * len(time_intervals),
+            time_intervals,
+            WeatherInterval.Daily,
+            WeatherType.Recent,
+            adaptive_window=window,
+            raise_on_error=False,
+            session=InvalidLocationSession(),
+            progress=[],
+        )
+    )
+
+    # One probe per halving, not every window down to a single day
+    assert len(requested) <= 10
+    assert (window.days, window.max_days) == (365, None)
+    assert data_df.empty
+    assert set(failures["status"]) == {400}
+    days = sorted(
+        day
+        for start, end in failures["time_interval"]
+        for day in pd.date_range(start.replace("/", "-"), end.replace("/", "-"))
+    )
+    assert days[0].strftime("%Y/%m/%d") == time_interval[0]
+    assert days[-1].strftime("%Y/%m/%d") == time_interval[1]
+    assert len(set(days)) == 701
+
+
+def test_adaptive_window_min_days():
+    window = AdaptiveWindow(5, min_days=2, target_seconds=1.0)
+    window.observe(1, 100.0, 10)
+    assert window.days == 2
+
+
+def test_run_queries_seven_day(monkeypatch):
+    async def fake_fetch(url, session, weather_variable, *args):
+        body = {"temperature": len(url)} if "10" in url else [{"temperature": 1}]
+        return json.dumps(body).encode(), weather_variable, url
+
+    monkeypatch.setattr(weather, "_fetch", fake_fetch)
+    url_list = [
+        "https://weathertest.sentera.com/seven-day-forecast/10.5/-90.25",
+        "https://weathertest.sentera.com/seven-day-forecast/20/-80",
+    ]
+    data_df = asyncio.run(
+        weather.run_queries(
+            url_list,
+            [WeatherVariable.Undefined] * 2,
+            [["", ""]] * 2,
+            WeatherInterval.Undefined,
+            WeatherType.SevenDay,
+            location_list=[(10.5, -90.25), (20.0, -80.0)],
+        )
+    )
+
+    data_df = data_df.sort_values("lat").reset_index(drop=True)
+    assert data_df["lat"].tolist() == [10.5, 20.0]
+    assert data_df["long"].tolist() == [-90.25, -80.0]
+    assert data_df["temperature"].tolist() == [len(url_list[0]), 1]
+
+
+def test_url_location():
+    assert weather._url_location(
+        "https://weathertest.sentera.com/seven-day-forecast/-10.5/90"
+    ) == (-10.5, 90.0)
+
+
+def test_run_queries_resumes_from_checkpoint(monkeypatch, tmp_path):
+    fetched = []
+
+    async def fake_fetch(url, session, weather_variable, *args):
+        fetched.append(url)
+        if url.endswith("/20/-80") and len(fetched) <= 2:
+            raise RuntimeError("interrupted")
+        return json.dumps({"temperature": 1}).encode(), weather_variable, url
+
+    monkeypatch.setattr(weather, "_fetch", fake_fetch)
+    url_list = [
+        "https://weathertest.sentera.com/seven-day-forecast/10/-90",
+        "https://weathertest.sentera.com/seven-day-forecast/20/-80",
+    ]
+    args = (
+        url_list,
+        [WeatherVariable.Undefined] * 2,
+        [["", ""]] * 2,
+        WeatherInterval.Undefined,
+        WeatherType.SevenDay,
+    )
+    path = str(tmp_path / "checkpoint.db")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(weather.run_queries(*args, checkpoint=path))
+    assert sorted(fetched) == sorted(url_list)
+
+    data_df = asyncio.run(weather.run_queries(*args, checkpoint=path))
+    assert fetched[2:] == [url_list[1]]
+    assert len(data_df) == 2
+
+
+def test_run_queries_failure_report(monkeypatch):
+    failing = {"https://weathertest.sentera.com/seven-day-forecast/20/-80"}
+
+    @tenacity.retry(
+        retry=tenacity.retry_if_exception_type(aiohttp.ClientError),
+        stop=tenacity.stop_after_attempt(3),
+    )
+    async def fake_fetch(url, session, weather_variable, *args):
+        if url in failing:
+            raise aiohttp.ClientResponseError(None, (), status=503)
+        return json.dumps({"temperature": 1}).encode(), weather_variable, url
+
+    monkeypatch.setattr(weather, "_fetch", fake_fetch)
+    url_list = [
+        "https://weathertest.sentera.com/seven-day-forecast/10/-90",
+        "https://weathertest.sentera.com/seven-day-forecast/20/-80",
+    ]
+    data_df, failures = asyncio.run(
+        weather.run_queries(
+            url_list,
+            [WeatherVariable.Undefined] * 2,
+            [["", ""]] * 2,
+            WeatherInterval.Undefined,
+            WeatherType.SevenDay,
+            raise_on_error=False,
+        )
+    )
+
+    assert data_df["lat"].tolist() == [10.0]
+    assert failures["url"].tolist() == [url_list[1]]
+    assert failures["status"].tolist() == [503]
+    assert failures["attempts"].tolist() == [3]
+    assert failures["params"].tolist() == [{"start": "", "end": ""}]
+
+    events = []
+    asyncio.run(
+        weather.run_queries(
+            url_list,
+            [WeatherVariable.Undefined] * 2,
+            [["", ""]] * 2,
+            WeatherInterval.Undefined,
+            WeatherType.SevenDay,
+            raise_on_error=False,
+            progress=events.append,
+        )
+    )
+    assert events[-1]["finished"]
+    assert events[-1]["planned"] == 2
+    assert (events[-1]["done"], events[-1]["failed"]) == (1, 1)
+    assert events[-1]["in_flight"] == 0
+
+    failing.clear()
+    data_df, failures = asyncio.run(
+        weather.rerun_failures(
+            failures, WeatherInterval.Undefined, WeatherType.SevenDay
+        )
+    )
+    assert data_df["lat"].tolist() == [20.0]
+    assert failures.empty
+
+
+def test_failure_record_omits_request_headers():
+    url = "https://weathertest.sentera.com/seven-day-forecast/20/-80"
+    request_info = aiohttp.RequestInfo(
+        URL(url),
+        "GET",
+        CIMultiDictProxy(CIMultiDict({"X-API-Key": "secret"})),
+        URL(url),
+    )
+    error = aiohttp.ClientResponseError(
+        request_info, (), status=503, message="Service Unavailable"
+    )
+
+    record = weather._failure_record(
+        url, WeatherVariable.Undefined, ["", ""], WeatherType.SevenDay, None, error
+    )
+
+    assert "secret" not in str(record)
+    assert record["error"] == "ClientResponseError: 503, Service Unavailable"
+    assert record["status"] == 503
+
+
+def test_hourly_to_daily():
+    hourly_df = pd.DataFrame(
+        {
+            "validTime": [
+                "2021-05-01T00:00:00Z",
+                "2021-05-01T12:00:00Z",
+                "2021-05-02T01:00:00Z",
+                "2021-05-01T01:00:00Z",
+            ],
+            "lat": [1.0, 1.0, 1.0, 2.0],
+            "long": [3.0, 3.0, 3.0, 4.0],
+            "temperature": [10.0, 20.0, 5.0, 7.0],
+            "precipitation": [0.1, 0.2, None, None],
+            "wind-speed": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+    daily_df = weather.hourly_to_daily(hourly_df)
+
+    assert daily_df["validDate"].tolist() == ["2021-05-01", "2021-05-01", "2021-05-02"]
+    assert daily_df["lat"].tolist() == [1.0, 2.0, 1.0]
+    assert daily_df["high-temperature"].tolist() == [20.0, 7.0, 5.0]
+    assert daily_df["low-temperature"].tolist() == [10.0, 7.0, 5.0]
+    assert daily_df["precipitation"].iloc[0] == pytest.approx(0.3)
+    assert daily_df["precipitation"].iloc[1:].isna().all()
+    assert "wind-speed" not in daily_df
+
+
+def test_run_queries_concurrent_api_keys_share_session():
+    seen = []
+
+    async def handler(request):
+        seen.append((request.match_info["lat"], request.headers["X-API-Key"]))
+        await asyncio.sleep(0.01)
+        return web.json_response({"temperature": 1})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/seven-day-forecast/{lat}/{long}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        def job(lat, key):
+            url = f"http://127.0.0.1:{port}/seven-day-forecast/{lat}/-90"
+            return weather.run_queries(
+                [url] * 3,
+                [WeatherVariable.Undefined] * 3,
+                [["", ""]] * 3,
+                WeatherInterval.Undefined,
+                WeatherType.SevenDay,
+                sentera_api_key=key,
+                session=session,
+            )
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                await asyncio.gather(job(10, "key-a"), job(20, "key-b"))
+                assert not session.closed
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+    assert sorted(seen) == [("10", "key-a")] * 3 + [("20", "key-b")] * 3
+    assert weather.WEATHER_HEADER["X-API-Key"] not in ("key-a", "key-b")
+
+
+HISTORICAL_RESPONSE = {
+    "latitude": 44.9,
+    "longitude": -93.2,
+    "units": "°F",
+    "series": [
+        {"validDate": "2021-05-01", "value": 51.5, "products": [{"name": "a"}]},
+        {"validDate": "2021-05-02", "value": None, "products": []},
+        {"validDate": "2021-05-03", "value": 48, "products": [{"name": "]"}]},
+    ],
+    "metadata": {"source": "test"},
+}
+
+
+def test_series_decoder_matches_buffered_decode():
+    body = json.dumps(HISTORICAL_RESPONSE, ensure_ascii=False).encode()
+    decoder = weather.SeriesDecoder(WeatherVariable.HighTemperature)
+    for i in range(0, len(body), 7):
+        decoder.feed(body[i : i + 7])
+
+    assert decoder.nbytes == len(body)
+    pd.testing.assert_frame_equal(
+        decoder.finish(),
+        weather._series_df(WeatherVariable.HighTemperature, body),
+        check_dtype=False,
+    )
+
+
+def test_series_decoder_truncated_response():
+    decoder = weather.SeriesDecoder(WeatherVariable.HighTemperature)
+    decoder.feed(json.dumps(HISTORICAL_RESPONSE).encode()[:80])
+    with pytest.raises(ValueError):
+        decoder.finish()
+
+
+@pytest.mark.parametrize("backend", ["pandas", "arrow", "polars"])
+def test_run_queries_streams_series(backend):
+    if backend != "pandas":
+        pytest.importorskip("pyarrow")
+    if backend == "polars":
+        pytest.importorskip("polars")
+
+    async def handler(request):
+        response = web.StreamResponse()
+        await response.prepare(request)
+        body = json.dumps(HISTORICAL_RESPONSE).encode()
+        for i in range(0, len(body), 16):
+            await response.write(body[i : i + 16])
+        await response.write_eof()
+        return response
+
+    async def recent_handler(request):
+        start, end = (
+            datetime.datetime.strptime(request.query[key], "%Y/%m/%d")
+            for key in ("start", "end")
+        )
+        sign = -1 if "low" in request.match_info["variable"] else 1
+        days = [
+            start + datetime.timedelta(days=i) for i in range((end - start).days + 1)
+        ]
+        return web.json_response(
+            {
+                "latitude": 44.9,
+                "longitude": -93.2,
+                "series": [
+                    {
+                        "validDate": day.strftime("%Y-%m-%d"),
+                        "value": sign * day.day,
+                        "products": [],
+                    }
+                    for day in days
+                ],
+            }
+        )
+
+    async def run(*args):
+        app = web.Application()
+        app.router.add_get("/historical/{variable}/{lat}/{long}", handler)
+        app.router.add_get("/recent/{variable}/{lat}/{long}", recent_handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url_list, *args = args
+        try:
+            return await weather.run_queries(
+                [f"http://127.0.0.1:{port}{url}" for url in url_list],
+                *args,
+                backend=backend,
+                progress=events.append,
+            )
+        finally:
+            await runner.cleanup()
+
+    # Two variables over two windows sharing their boundary day
+    events = []
+    windows = [["2021/05/01", "2021/05/06"], ["2021/05/06", "2021/05/10"]]
+    recent_df = asyncio.run(
+        run(
+            [
+                f"/recent/daily-{variable}/44.9/-93.2"
+                for variable in ("high-temperature", "low-temperature")
+                for _ in windows
+            ],
+            [WeatherVariable.HighTemperature] * 2
+            + [WeatherVariable.LowTemperature] * 2,
+            windows * 2,
+            WeatherInterval.Daily,
+            WeatherType.Recent,
+        )
+    )
+    if backend != "pandas":
+        recent_df = recent_df.to_pandas()
+    recent_df = recent_df.sort_values("validDate")
+    assert recent_df["validDate"].tolist() == [
+        f"2021-05-{day:02}" for day in range(1, 11)
+    ]
+    assert recent_df["high-temperature"].tolist() == list(range(1, 11))
+    assert recent_df["low-temperature"].tolist() == [-day for day in range(1, 11)]
+
+    events = []
+    data_df = asyncio.run(
+        run(
+            ["/historical/high-temperature/44.9/-93.2"],
+            [WeatherVariable.HighTemperature],
+            [["2021/05/01", "2021/05/03"]],
+            WeatherInterval.Daily,
+            WeatherType.Historical,
+        )
+    )
+    assert events[-1]["bytes"] == len(json.dumps(HISTORICAL_RESPONSE).encode())
+    if backend != "pandas":
+        assert (
+            type(data_df).__module__.split(".")[0]
+            == {
+                "arrow": "pyarrow",
+                "polars": "polars",
+            }[backend]
+        )
+        data_df = data_df.to_pandas()
+
+    assert data_df["validDate"].tolist() == ["2021-05-01", "2021-05-02", "2021-05-03"]
+    assert data_df["lat"].tolist() == [44.9] * 3
+    assert data_df["high-temperature"].iloc[[0, 2]].tolist() == [51.5, 48.0]
+    assert pd.isna(data_df["high-temperature"].iloc[1])
+
+
+def test_run_queries_retries_failed_requests():
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request.path)
+        if len(attempts) == 1:
+            return web.Response(status=503)
+        return web.json_response(HISTORICAL_RESPONSE)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/historical/{variable}/{lat}/{long}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await weather.run_queries(
+                [f"http://127.0.0.1:{port}/historical/high-temperature/44.9/-93.2"],
+                [WeatherVariable.HighTemperature],
+                [["2021/05/01", "2021/05/03"]],
+                WeatherInterval.Daily,
+                WeatherType.Historical,
+                raise_on_error=False,
+                progress=[],
+            )
+        finally:
+            await runner.cleanup()
+
+    data_df, failures = asyncio.run(run())
+    assert len(attempts) == 2
+    assert failures.empty
+    assert data_df["validDate"].tolist() == ["2021-05-01", "2021-05-02", "2021-05-03"]
+
+
+def test_failed_run_cancels_its_requests():
+    requested = []
+
+    async def handler(request):
+        requested.append(request.path)
+        if request.match_info["lat"] == "0":
+            return web.Response(status=404)
+        await asyncio.sleep(0.05)
+        return web.json_response(HISTORICAL_RESPONSE)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/historical/{variable}/{lat}/{long}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url_list = [
+            f"http://127.0.0.1:{port}/historical/high-temperature/{lat}/-93.2"
+            for lat in range(50)
+        ]
+        # Left open by the run, like the shared session of the background runner
+        async with aiohttp.ClientSession() as session:
+            try:
+                with pytest.raises(tenacity.RetryError):
+                    await weather.run_queries(
+                        url_list,
+                        [WeatherVariable.HighTemperature] * 50,
+                        [["2021/05/01", "2021/05/03"]] * 50,
+                        WeatherInterval.Daily,
+                        WeatherType.Historical,
+                        session=session,
+                        scheduler=WeatherScheduler(limit=5),
+                        progress=[],
+                    )
+                await asyncio.sleep(0.3)
+            finally:
+                await runner.cleanup()
+
+    asyncio.run(run())
+    assert len(requested) < 20
+
+
+def test_run_queries_not_modified_without_cached_response(tmp_path):
+    class NotModifiedSession:
+        closed = False
+
+        @contextlib.asynccontextmanager
+        async def get(self, url, params=None, headers=None, raise_for_status=False):
+            yield ReplayResponse(url, 304, b"")
+
+    data_df, failures = asyncio.run(
+        weather.run_queries(
+            ["https://weathertest.sentera.com/historical/high-temperature/44.9/-93.2"],
+            [WeatherVariable.HighTemperature],
+            [["2021/05/01", "2021/05/03"]],
+            WeatherInterval.Daily,
+            WeatherType.Historical,
+            session=NotModifiedSession(),
+            cache=str(tmp_path / "cache.db"),
+            raise_on_error=False,
+            progress=[],
+        )
+    )
+
+    assert data_df.empty
+    assert failures["attempts"].tolist() == [1]
+    assert "304 Not Modified without a cached response" in failures["error"].iloc[0]
+
+
+def test_run_queries_revalidates_cached_responses(tmp_path):
+    conditional = []
+
+    async def handler(request):
+        conditional.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response([{"temperature": 1}], headers={"ETag": '"v1"'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/seven-day-forecast/{lat}/{long}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/seven-day-forecast/10/-90"
+        try:
+            return [
+                await weather.run_queries(
+                    [url],
+                    [WeatherVariable.Undefined],
+                    [["", ""]],
+                    WeatherInterval.Undefined,
+                    WeatherType.SevenDay,
+                    cache=str(tmp_path / "cache.db"),
+                )
+                for _ in range(2)
+            ]
+        finally:
+            await runner.cleanup()
+
+    first, second = asyncio.run(run())
+
+    assert conditional == [None, '"v1"']
+    pd.testing.assert_frame_equal(first, second)
+    assert second["temperature"].tolist() == [1]
@@ -0,0 +1,323 @@
+"""
+Alternative transports of Weather API requests.
+
+The sessions of this module stand in for the ``aiohttp.ClientSession`` passed to ``sentera.weather.run_queries`` (or
+as ``transport`` to ``sentera.api.get_weather``):
+
+* ``RecordingSession`` sends every request and stores its response, along with how long it took, in a
+  ``ResponseArchive``. ``ReplaySession`` answers the same requests from the archive without any network access,
+  either at full speed or after the recorded latencies, so that a production job can be reproduced and profiled
+  locally.
+* ``Http2Session`` sends requests over HTTP/2, multiplexing many concurrent requests over a few connections. It needs
+  the optional ``httpx[http2]`` dependency, installed with ``pip install sentera[http2]``.
+"""
+import asyncio
+import contextlib
+import sqlite3
+import time
+import zlib
+
+import aiohttp
+from multidict import CIMultiDict
+
+from sentera.checkpoint import Checkpoint
+from sentera.database import SQLiteFile
+
+
+class ResponseArchive(SQLiteFile):
+    """
+    Compact archive of recorded responses, keyed by request URL and query parameters.
+
+    Bodies are stored zlib compressed in a single SQLite file. Recording the same request again replaces it.
+    """
+
+    TABLE = "responses"
+    COLUMNS = (
+        "key TEXT PRIMARY KEY, "
+        "url TEXT NOT NULL, "
+        "status INTEGER NOT NULL, "
+        "elapsed REAL NOT NULL, "
+        "body BLOB NOT NULL"
+    )
+
+    def put(self, url, params, status, body, elapsed):
+        """
+        Record a response.
+
+        :param url: Request URL.
+        :param params: Dict of query parameters.
+        :param status: HTTP status of the response.
+        :param body: Response body, as bytes.
+        :param elapsed: Seconds from sending the request to receiving the whole body.
+        """
+        self._execute(
+            "INSERT OR REPLACE INTO responses (key, url, status, elapsed, body) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                Checkpoint.request_key(url, params),
+                url,
+                status,
+                elapsed,
+                sqlite3.Binary(zlib.compress(body)),
+            ),
+        )
+
+    def get(self, url, params):
+        """
+        Return a recorded response, or None if the request was never recorded.
+
+        :param url: Request URL.
+        :param params: Dict of query parameters.
+        :return: (**status**, **body**, **elapsed**) or None
+        """
+        row = self._fetchone(
+            "SELECT status, body, elapsed FROM responses WHERE key = ?",
+            (Checkpoint.request_key(url, params),),
+        )
+        if row is None:
+            return None
+        status, body, elapsed = row
+        return status, zlib.decompress(body), elapsed
+
+
+class _ReplayContent:
+    def __init__(self, body):
+        self._body = body
+
+    async def iter_chunked(self, n):
+        for start in range(0, len(self._body), n):
+            yield self._body[start : start + n]
+
+
+class ReplayResponse:
+    """Response served from memory, supporting the parts of ``aiohttp.ClientResponse`` used by the library."""
+
+    def __init__(self, url, status, body, headers=None):
+        """
+        Initialize a response.
+
+        :param url: Request URL.
+        :param status: HTTP status of the response.
+        :param body: Response body, as bytes.
+        :param headers: (optional) Response headers.
+        """
+        self.url = url
+        self.status = status
+        self.headers = CIMultiDict(headers or {})
+        self.content = _ReplayContent(body)
+        self._body = body
+
+    async def read(self):
+        """Return the whole response body."""
+        return self._body
+
+    def raise_for_status(self):
+        """Raise ``aiohttp.ClientResponseError`` if the status is an error status."""
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                None,
+                (),
+                status=self.status,
+                message=self._body.decode(errors="replace"),
+            )
+
+
+class _ArchiveSession:
+    def __init__(self, archive):
+        self._close_archive = isinstance(archive, str)
+        self.archive = ResponseArchive(archive) if self._close_archive else archive
+        self.closed = False
+
+    async def close(self):
+        """Close the archive, if it was opened from a path."""
+        if self._close_archive:
+            self.archive.close()
+        self.closed = True
+
+
+class RecordingSession(_ArchiveSession):
+    """Sends requests through a real session and records every response in an archive."""
+
+    def __init__(self, archive, session=None):
+        """
+        Initialize a recording session.
+
+        :param archive: A ``sentera.transport.ResponseArchive``, or a path to one, to record into.
+        :param session: (optional) The ``aiohttp.ClientSession`` sending the requests. If not given, one is created
+                        on first use and closed by ``close``.
+        """
+        super().__init__(archive)
+        self.session = session
+        self._own_session = session is None
+
+    @contextlib.asynccontextmanager
+    async def get(self, url, params=None, headers=None, raise_for_status=False):
+        """
+        Send a GET request and record its response, which is read whole before being returned.
+
+        :param url: Request URL.
+        :param params: (optional) Dict of query parameters.
+        :param headers: (optional) Dict of request headers. Headers are not recorded.
+        :param raise_for_status: (optional) Raise ``aiohttp.ClientResponseError`` on an error status, after
+                                 recording the response.
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        started = time.monotonic()
+        async with self.session.get(url, params=params, headers=headers) as response:
+            body = await response.read()
+        self.archive.put(
+            url, params or {}, response.status, body, time.monotonic() - started
+        )
+
+        response = ReplayResponse(url, response.status, body, response.headers)
+        if raise_for_status:
+            response.raise_for_status()
+        yield response
+
+    async def close(self):
+        """Close the archive if it was opened from a path, and the session if it was created here."""
+        if self._own_session and self.session is not None:
+            await self.session.close()
+        await super().close()
+
+
+class ReplaySession(_ArchiveSession):
+    """Answers requests from an archive of recorded responses, without any network access."""
+
+    def __init__(self, archive, latency=False, speed=1.0):
+        """
+        Initialize a replay session.
+
+        :param archive: A ``sentera.transport.ResponseArchive``, or a path to one, to replay from.
+        :param latency: (optional) If True, delay each response by its recorded latency. Otherwise responses are
+                        served at full speed.
+        :param speed: (optional) Factor recorded latencies are divided by, e.g. 2 to replay twice as fast.
+        """
+        super().__init__(archive)
+        self.latency = latency
+        self.speed = speed
+
+    @contextlib.asynccontextmanager
+    async def get(self, url, params=None, headers=None, raise_for_status=False):
+        """
+        Return the recorded response of a GET request.
+
+        :param url: Request URL.
+        :param params: (optional) Dict of query parameters.
+        :param headers: (optional) Dict of request headers, which are ignored.
+        :param raise_for_status: (optional) Raise ``aiohttp.ClientResponseError`` if the recorded status is an error
+                                 status.
+        """
+        recorded = self.archive.get(url, params or {})
+        if recorded is None:
+            raise LookupError(f"No recorded response for {url} with {params}")
+        status, body, elapsed = recorded
+        if self.latency:
+            await asyncio.sleep(elapsed / self.speed)
+
+        response = ReplayResponse(url, status, body)
+        if raise_for_status:
+            response.raise_for_status()
+        yield response
+
+
+class _StreamedContent:
+    def __init__(self, response):
+        self._response = response
+
+    async def iter_chunked(self, n):
+        async for chunk in self._response.aiter_bytes(n):
+            yield chunk
+
+
+class Http2Response:
+    """Adapts a streamed ``httpx.Response`` to the parts of ``aiohttp.ClientResponse`` used by the library."""
+
+    def __init__(self, url, response):
+        """
+        Initialize a response.
+
+        :param url: Request URL.
+        :param response: The ``httpx.Response``, opened with ``httpx.AsyncClient.stream``.
+        """
+        self.url = url
+        self.status = response.status_code
+        self.headers = response.headers
+        self.content = _StreamedContent(response)
+        self._response = response
+
+    async def read(self):
+        """Return the whole response body."""
+        return await self._response.aread()
+
+    def raise_for_status(self):
+        """Raise ``aiohttp.ClientResponseError`` if the status is an error status."""
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                None, (), status=self.status, message=self._response.reason_phrase
+            )
+
+
+class Http2Session:
+    """
+    Sends requests over HTTP/2, multiplexing up to the server's stream limit over each of a few connections.
+
+    Failures are raised as their ``aiohttp`` equivalents, so they are retried and reported like those of the default
+    transport. A session must only be used from one event loop, e.g. through ``sentera.api.get_weather``.
+    """
+
+    def __init__(self, max_connections=4, prior_knowledge=False, timeout=300.0):
+        """
+        Initialize an HTTP/2 session.
+
+        :param max_connections: (optional) Maximum number of connections opened to each host.
+        :param prior_knowledge: (optional) If True, speak HTTP/2 over cleartext *http://* urls without negotiating it
+                                first. Otherwise HTTP/2 is negotiated over TLS, falling back to HTTP/1.1.
+        :param timeout: (optional) Seconds allowed to connect, and between two reads of a response. Waiting for a free
+                        stream is not limited.
+        """
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError(
+                "The HTTP/2 transport needs httpx[http2]: pip install sentera[http2]"
+            ) from e
+
+        self._transport_error = httpx.TransportError
+        self._client = httpx.AsyncClient(
+            http1=not prior_knowledge,
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(timeout, pool=None),
+        )
+        self.closed = False
+
+    @contextlib.asynccontextmanager
+    async def get(self, url, params=None, headers=None, raise_for_status=False):
+        """
+        Send a GET request, streaming its response.
+
+        :param url: Request URL.
+        :param params: (optional) Dict of query parameters.
+        :param headers: (optional) Dict of request headers.
+        :param raise_for_status: (optional) Raise ``aiohttp.ClientResponseError`` on an error status.
+        """
+        try:
+            async with self._client.stream(
+                "GET", url, params=params, headers=headers
+            ) as response:
+                response = Http2Response(url, response)
+                if raise_for_status:
+                    response.raise_for_status()
+                yield response
+        except self._transport_error as e:
+            raise aiohttp.ClientConnectionError(str(e)) from e
+
+    async def close(self):
+        """Close every connection of the session."""
+        await self._client.aclose()
+        self.closed = True
@@ -8,20 +8,34 @@ Many of these functions have been defined to support asynchronous requests of we
 asynchronous manner by the ``sentera.api`` module.
 """
 import asyncio
+import codecs
+import contextlib
 import datetime
 import json
-import os
+import math
 import re
-from distutils.util import strtobool
+import time
+from array import array
 from enum import Enum
 
 import aiohttp
 import pandas as pd
-import tqdm
 from pandas import json_normalize
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random
+from tenacity import (
+    RetryError,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random,
+)
 
+from sentera import backends
+from sentera.backends import Backend
+from sentera.cache import ResponseCache
+from sentera.checkpoint import Checkpoint
 from sentera.configuration import Configuration
+from sentera.progress import ProgressReporter, progress_callbacks
+from sentera.scheduler import Priority, get_scheduler
 
 WEATHER_BASE_URL = "https://weather.sentera.com"
 WEATHER_HEADER = {"X-API-Key": "mc049Cu9FJ3lHiQYDYQTd3ZOzsOBt29d2gyi3e0r"}
@@ -165,6 +179,22 @@ def build_weather_url(weather_type, weather_variable, weather_interval, lat, lon
         )
 
 
+def weather_headers(sentera_api_key=None):
+    """
+    Construct the headers to be sent with each request to the Weather API.
+
+    A new dict is returned on every call, so credentials for one request never leak into another.
+
+    :param sentera_api_key: (optional) A Sentera API key giving access to the data. Defaults to the key in
+                            ``WEATHER_HEADER``.
+    :return: headers: Dict of request headers.
+    """
+    headers = dict(WEATHER_HEADER)
+    if sentera_api_key:
+        headers["X-API-Key"] = sentera_api_key
+    return headers
+
+
 def create_params(weather_type, time_interval):
     """
     Construct query parameter dict to be passed as a request to the Weather API.
@@ -212,7 +242,239 @@ def check_time_interval(time_interval, weather_type):
     return start, end
 
 
-def split_time_interval(time_interval, weather_type, weather_interval):
+WINDOW_DAYS = {WeatherInterval.Hourly: 5, WeatherInterval.Daily: 90}
+
+
+class _WindowRejected(Exception):
+    """Raised for a *recent* request whose window the server refused, to be split into smaller windows."""
+
+    def __init__(self, url, weather_variable, time_interval, error):
+        super().__init__(f"Window {time_interval} of {url} refused: {error.status}")
+        self.url = url
+        self.weather_variable = weather_variable
+        self.time_interval = time_interval
+        self.error = error
+
+
+WINDOW_REJECTED_STATUSES = {400, 413, 422}
+
+
+class AdaptiveWindow:
+    """
+    Request window length for *recent* weather that adapts to observed response latency and payload size.
+
+    Pass an instance as ``window_days`` to ``sentera.api.get_weather``. Every response of the run is fed back through
+    ``observe``, and ``days`` is re-estimated so that one request stays within ``target_seconds`` and ``target_bytes``.
+    Windows the server refuses are split and retried within the same run, and once a smaller window of the same
+    request is accepted, the refusal is fed back through ``reject``, which lowers ``max_days`` below the refused span
+    so that later plans never exceed what the API allows. Reusing the same instance across calls lets each plan start
+    from what the previous one learned.
+    """
+
+    def __init__(
+        self,
+        days,
+        min_days=1,
+        max_days=None,
+        target_seconds=5.0,
+        target_bytes=5000000,
+        smoothing=0.2,
+    ):
+        """
+        Initialize an adaptive window.
+
+        :param days: Initial window length in days.
+        :param min_days: (optional) Smallest window the estimate may shrink to.
+        :param max_days: (optional) Largest window the server is known to allow. Unbounded by default.
+        :param target_seconds: (optional) Desired latency of a single request.
+        :param target_bytes: (optional) Desired payload size of a single response.
+        :param smoothing: (optional) Weight given to each new observation in the running per-day estimates.
+        """
+        self.days = days
+        self.min_days = min_days
+        self.max_days = max_days
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.smoothing = smoothing
+        self._seconds_per_day = None
+        self._bytes_per_day = None
+
+    def _clamp(self, days):
+        days = max(self.min_days, int(days))
+        if self.max_days is not None:
+            days = min(self.max_days, days)
+        return days
+
+    def _smooth(self, current, value):
+        if current is None:
+            return value
+        return (1 - self.smoothing) * current + self.smoothing * value
+
+    def observe(self, days, seconds, nbytes):
+        """
+        Record one response covering ``days`` days and update the suggested window length.
+
+        :param days: Number of days covered by the request.
+        :param seconds: Time taken by the request.
+        :param nbytes: Size of the response body.
+        """
+        days = max(days, 1)
+        self._seconds_per_day = self._smooth(self._seconds_per_day, seconds / days)
+        self._bytes_per_day = self._smooth(self._bytes_per_day, nbytes / days)
+
+        limits = []
+        if self._seconds_per_day > 0:
+            limits.append(self.target_seconds / self._seconds_per_day)
+        if self._bytes_per_day > 0:
+            limits.append(self.target_bytes / self._bytes_per_day)
+        if limits:
+            # Never more than double per observation so one fast response can't overshoot
+            self.days = self._clamp(min(min(limits), 2 * self.days))
+
+    def reject(self, days):
+        """
+        Record that the server refused a request covering ``days`` days.
+
+        :param days: Number of days covered by the refused request.
+        """
+        cap = days - 1
+        if self.max_days is not None:
+            # A stale, larger refusal must not raise a cap already learned
+            cap = min(self.max_days, cap)
+        self.max_days = max(self.min_days, cap)
+        self.days = self._clamp(min(self.days, days // 2))
+
+
+class _RefusedWindows:
+    """
+    Windows of a *recent* run refused by the server, split until it accepts them or shrinking can no longer help.
+
+    A refusal is only taken for a window too large once a smaller window of the same URL is accepted. Until then, the
+    URL is probed with the first half of its refused window while the rest waits, so a request refused for another
+    reason, e.g. an invalid location, costs one request per halving instead of splitting every window down to
+    ``min_days``. Windows refused at a span the server accepted elsewhere in the run fail straight away.
+    """
+
+    def __init__(
+        self, adaptive_window, weather_type, weather_interval, failures, progress
+    ):
+        self.adaptive_window = adaptive_window
+        self.weather_type = weather_type
+        self.weather_interval = weather_interval
+        self.failures = failures
+        self.progress = progress
+        self._accepted_days = 0
+        # URL -> (refused span, probe window, waiting (weather_variable, time_interval) pairs)
+        self._probes = {}
+
+    def _days(self, time_interval):
+        start, end = check_time_interval(time_interval, self.weather_type)
+        return (end - start).days
+
+    def _split(self, weather_variable, time_interval, window_days):
+        return [
+            (weather_variable, window)
+            for window in split_time_interval(
+                time_interval, self.weather_type, self.weather_interval, window_days
+            )
+        ]
+
+    def _release(self, url):
+        """Return the waiting windows of a URL, split to the current window length."""
+        _, _, waiting = self._probes.pop(url, (None, None, []))
+        return [
+            window
+            for weather_variable, time_interval in waiting
+            for window in self._split(
+                weather_variable, time_interval, self.adaptive_window
+            )
+        ]
+
+    def _fail(self, rejected, location, windows):
+        for weather_variable, time_interval in windows:
+            if self.failures is None:
+                raise rejected.error
+            self.failures.append(
+                _failure_record(
+                    rejected.url,
+                    weather_variable,
+                    time_interval,
+                    self.weather_type,
+                    location,
+                    rejected.error,
+                )
+            )
+            self.progress.complete(failed=True)
+
+    def _retry(self, rejected):
+        url = rejected.url
+        days = self._days(rejected.time_interval)
+        probe = self._probes.get(url)
+        if probe is not None and probe[1] != rejected.time_interval:
+            # Waits for the outcome of the window probing the URL
+            probe[2].append((rejected.weather_variable, rejected.time_interval))
+            return [], []
+
+        max_days = self.adaptive_window.max_days
+        if max_days is not None and days > max_days:
+            # Already known to be too large
+            send = self._split(
+                rejected.weather_variable, rejected.time_interval, self.adaptive_window
+            )
+            return send + self._release(url), []
+        if days <= self._accepted_days or days // 2 < self.adaptive_window.min_days:
+            # Shrinking can't help, so the refusal is about something else
+            refused = (rejected.weather_variable, rejected.time_interval)
+            return [], [refused] + self._release(url)
+
+        first, *rest = self._split(
+            rejected.weather_variable,
+            rejected.time_interval,
+            max(self.adaptive_window.min_days, days // 2),
+        )
+        waiting = [] if probe is None else probe[2]
+        self._probes[url] = (days, first[1], waiting + rest)
+        return [first], []
+
+    def refuse(self, rejected, location):
+        """
+        Handle a refused window, reporting the windows given up on as failed.
+
+        :param rejected: The ``_WindowRejected`` raised for it.
+        :param location: Location of the request, as passed to ``run_queries``.
+        :return: **send** - List of (*weather_variable*, *time_interval*) of ``rejected.url`` to request now.
+        """
+        send, failed = self._retry(rejected)
+        # The refused request is replaced rather than completed
+        self.progress.plan(len(send) + len(failed) - 1)
+        self._fail(rejected, location, failed)
+        return send
+
+    def accept(self, url, time_interval):
+        """
+        Handle an accepted window, releasing the windows of ``url`` waiting for it.
+
+        :param url: URL of the accepted request.
+        :param time_interval: Its time interval.
+        :return: **send** - List of (*weather_variable*, *time_interval*) of ``url`` to request now.
+        """
+        if self.adaptive_window is None:
+            return []
+        days = self._days(time_interval)
+        self._accepted_days = max(self._accepted_days, days)
+        if url not in self._probes:
+            return []
+        refused_days = self._probes[url][0]
+        if days < refused_days:
+            self.adaptive_window.reject(refused_days)
+        send = self._release(url)
+        self.progress.plan(len(send))
+        return send
+
+
+def split_time_interval(
+    time_interval, weather_type, weather_interval, window_days=None
+):
     """
     Create the list of time intervals to be passed to each request made to the Weather API.
 
@@ -224,6 +486,8 @@ def split_time_interval(time_interval, weather_type, weather_interval):
     :param time_interval: Overall time interval of request, in **YYYY/MM/DD** ISO8601 format.
     :param weather_type: Choice of weather type, as an instance of the ``sentera.weather.WeatherType`` Enum
     :param weather_interval: Choice of weather interval, as an instance of the ``sentera.weather.WeatherInterval`` Enum
+    :param window_days: (optional) Length of each sub-interval in days, either as an int or a
+                        ``sentera.weather.AdaptiveWindow``. Defaults to the values in ``WINDOW_DAYS``.
     :return: time_intervals: List of individual intervals to be constructed into individual queries
     """
     if weather_type == WeatherType.Recent:
@@ -235,10 +499,13 @@ def split_time_interval(time_interval, weather_type, weather_interval):
                 f"Earliest allowable start date is {(today - datetime.timedelta(days=730)).date()}"
             )
 
-        if weather_interval == WeatherInterval.Daily:
-            delta = datetime.timedelta(days=90)
-        else:
-            delta = datetime.timedelta(days=5)
+        if isinstance(window_days, AdaptiveWindow):
+            window_days = window_days.days
+        if not window_days:
+            window_days = WINDOW_DAYS.get(
+                weather_interval, WINDOW_DAYS[WeatherInterval.Hourly]
+            )
+        delta = datetime.timedelta(days=window_days)
 
         time_intervals = []
         current_time = start
@@ -269,22 +536,184 @@ def split_time_interval(time_interval, weather_type, weather_interval):
     return None
 
 
-def _combine_seven_day(url, response_json, data_df):
-    data = json_normalize(response_json)
+def _seven_day_records(response_json, lat, long):
+    if not isinstance(response_json, list):
+        response_json = [response_json]
+    return [{**record, "lat": lat, "long": long} for record in response_json]
+
+
+def _url_location(url):
+    lat, long = url.rstrip("/").rsplit("/", 2)[-2:]
+    return float(lat), float(long)
+
+
+STREAM_CHUNK_SIZE = 65536
+SERIES_START = re.compile(r'"series"\s*:\s*\[')
+
+
+class SeriesDecoder:
+    """
+    Incrementally decodes the ``series`` array of a Weather API response into column buffers.
+
+    Chunks of the response body are passed to ``feed`` as they arrive. Each record of the ``series`` array is decoded
+    as soon as it is complete and appended to its columns, with values kept in a packed float64 buffer, so neither the
+    raw body nor the parsed records are held in memory. Only the small remainder of the response outside ``series`` is
+    buffered, to read its *latitude* and *longitude*.
+    """
 
-    data["lat"] = re.findall(r"\D+/(-?[0-9]+.[0-9]+)/(-?[0-9]+.[0-9]+)", url)[0][0]
-    data["long"] = re.findall(r"\D+/(-?[0-9]+.[0-9]+)/(-?[0-9]+.[0-9]+)", url)[0][1]
+    def __init__(self, weather_variable):
+        """
+        Initialize a decoder.
+
+        :param weather_variable: Weather variable of the response, naming its value column.
+        """
+        self.weather_variable = weather_variable
+        self.nbytes = 0
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._head = None
+        self._tail = None
+        self._rows = 0
+        self._columns = {}
+
+    def feed(self, chunk):
+        """
+        Decode a chunk of the response body.
+
+        :param chunk: Next bytes of the response body
+        """
+        self.nbytes += len(chunk)
+        text = self._text.decode(chunk)
+        if self._tail is not None:
+            self._tail.append(text)
+            return
+        self._buffer += text
+
+        if self._head is None:
+            match = SERIES_START.search(self._buffer)
+            if match is None:
+                return
+            self._head = self._buffer[: match.end()]
+            self._buffer = self._buffer[match.end() :]
+
+        position = 0
+        while True:
+            while position < len(self._buffer) and self._buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(self._buffer):
+                break
+            if self._buffer[position] == "]":
+                self._tail = [self._buffer[position:]]
+                break
+            try:
+                record, position = self._decoder.raw_decode(self._buffer, position)
+            except json.JSONDecodeError:
+                # Record split across chunks
+                break
+            self._append(record)
+        self._buffer = "" if self._tail is not None else self._buffer[position:]
+
+    def _append(self, record):
+        for key, value in record.items():
+            if key == "products":
+                continue
+            column = self._columns.get(key)
+            if key == "value":
+                if column is None:
+                    column = self._columns[key] = array("d", [math.nan] * self._rows)
+                column.append(math.nan if value is None else float(value))
+            else:
+                if column is None:
+                    column = self._columns[key] = [None] * self._rows
+                column.append(value)
+        self._rows += 1
+        for key, column in self._columns.items():
+            if len(column) < self._rows:
+                column.append(math.nan if key == "value" else None)
+
+    def finish(self, backend=Backend.Pandas):
+        """
+        Return the decoded response, once the whole body has been fed.
+
+        :param backend: (optional) Kind of table to return, as a string or an instance of the
+                        ``sentera.backends.Backend`` Enum. *polars* returns the same Arrow table as *arrow*.
+        :return: **data** - Pandas DataFrame, or ``pyarrow.Table``, with the columns of the ``series`` records, the
+                 value column named after the weather variable, and the *lat* and *long* of the response
+        """
+        if self._tail is None:
+            raise ValueError("Response ended before the end of its series array")
+        response_json = json.loads(
+            self._head + "".join(self._tail) + self._text.decode(b"", final=True)
+        )
 
-    return pd.concat([data_df, data], axis=0)
+        columns = {
+            str(self.weather_variable) if key == "value" else key: column
+            for key, column in self._columns.items()
+        }
+        if Backend(backend) != Backend.Pandas:
+            return backends.series_table(
+                columns, response_json["latitude"], response_json["longitude"]
+            )
+        data = pd.DataFrame(columns)
+        data["lat"] = response_json["latitude"]
+        data["long"] = response_json["longitude"]
+        return data
 
 
-def _merge_to_full_df(weather_variable, weather_interval, response_json, data_df):
+def _series_df(weather_variable, response):
+    if isinstance(response, pd.DataFrame):
+        # Already decoded while streaming
+        return response
+    response_json = json.loads(response)
     data = json_normalize(response_json["series"])
     data = data.rename(columns={"value": str(weather_variable)}).drop(
         columns=["products"]
     )
     data["lat"] = response_json["latitude"]
     data["long"] = response_json["longitude"]
+    return data
+
+
+def _series_table(weather_variable, response, location=None):
+    if not isinstance(response, (bytes, str)):
+        # Already decoded while streaming
+        return _located_table(response, location)
+    response_json = json.loads(response)
+    table = backends.records_table(response_json["series"])
+    if "products" in table.column_names:
+        table = table.drop_columns(["products"])
+    if "value" in table.column_names:
+        table = table.rename_columns(
+            [str(weather_variable) if n == "value" else n for n in table.column_names]
+        )
+    rows = table.num_rows
+    table = table.append_column(
+        "lat", backends.float_array(rows, response_json["latitude"])
+    ).append_column("long", backends.float_array(rows, response_json["longitude"]))
+    return _located_table(table, location)
+
+
+def _located_table(table, location):
+    """Label the rows of a series table with the requested location rather than the one echoed by the server."""
+    if location is None:
+        return table
+    for name, value in zip(("lat", "long"), location):
+        table = table.set_column(
+            table.column_names.index(name),
+            name,
+            backends.float_array(table.num_rows, float(value)),
+        )
+    return table
+
+
+def _merge_to_full_df(
+    weather_variable, weather_interval, response, data_df, location=None
+):
+    data = _series_df(weather_variable, response)
+    if location is not None:
+        # Rows are keyed on the requested location, not on the one echoed by the server
+        data = data.assign(lat=float(location[0]), long=float(location[1]))
 
     data_df = data_df.merge(
         data,
@@ -302,18 +731,331 @@ def _merge_to_full_df(weather_variable, weather_interval, response_json, data_df
     return data_df
 
 
+HOURLY_TO_DAILY = {
+    WeatherVariable.Temperature: [
+        (WeatherVariable.HighTemperature, "max"),
+        (WeatherVariable.LowTemperature, "min"),
+    ],
+    WeatherVariable.Precipitation: [(WeatherVariable.Precipitation, "sum")],
+    WeatherVariable.SolarRadiation: [(WeatherVariable.SolarRadiation, "sum")],
+    WeatherVariable.EvapotranspirationShort: [
+        (WeatherVariable.EvapotranspirationShort, "sum")
+    ],
+    WeatherVariable.EvapotranspirationTall: [
+        (WeatherVariable.EvapotranspirationTall, "sum")
+    ],
+}
+
+
+def hourly_to_daily(hourly_df):
+    """
+    Derive daily weather from an hourly *recent* weather DataFrame, as returned by ``run_queries``.
+
+    Daily high and low temperature are the maximum and minimum of the hourly temperature, while precipitation, solar
+    radiation and evapotranspiration are summed over the day. Days are taken from the date of each *validTime* as
+    returned by the API. Hourly variables without a daily counterpart (relative humidity, wind speed) are dropped.
+
+    :param hourly_df: Pandas DataFrame of hourly weather, keyed by *validTime*, *lat* and *long*
+    :return: daily_df: Pandas DataFrame of daily weather, keyed by *validDate*, *lat* and *long*
+    """
+    hourly_time = TIME_COLUMNS[WeatherInterval.Hourly]
+    daily_time = TIME_COLUMNS[WeatherInterval.Daily]
+
+    aggregations = {"max": {}, "min": {}, "sum": {}}
+    for hourly_variable, daily_variables in HOURLY_TO_DAILY.items():
+        if str(hourly_variable) not in hourly_df:
+            continue
+        for daily_variable, aggregation in daily_variables:
+            aggregations[aggregation][str(daily_variable)] = str(hourly_variable)
+
+    dates = pd.to_datetime(hourly_df[hourly_time]).dt.strftime("%Y-%m-%d")
+    grouped = hourly_df.groupby([dates.rename(daily_time), "lat", "long"])
+
+    daily_frames = []
+    for aggregation, columns in aggregations.items():
+        if not columns:
+            continue
+        source = grouped[list(set(columns.values()))]
+        if aggregation == "sum":
+            aggregated = source.sum(min_count=1)
+        else:
+            aggregated = source.agg(aggregation)
+        daily_frames.append(
+            pd.DataFrame(
+                {
+                    daily_variable: aggregated[hourly_variable]
+                    for daily_variable, hourly_variable in columns.items()
+                }
+            )
+        )
+
+    if not daily_frames:
+        return pd.DataFrame(columns=[daily_time, "lat", "long"])
+    return pd.concat(daily_frames, axis=1).reset_index()
+
+
+async def _read(response, weather_variable, decode):
+    if decode is None:
+        body = await response.read()
+        return body, len(body)
+
+    decoder = SeriesDecoder(weather_variable)
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        decoder.feed(chunk)
+    return decoder.finish(decode), decoder.nbytes
+
+
 @retry(
     retry=retry_if_exception_type(aiohttp.ClientError),
     wait=wait_random(min=0.25, max=0.75),
     stop=stop_after_attempt(5),
 )
-async def _fetch(url, session, weather_variable, time_interval, weather_type):
-    async with session.get(
+async def _fetch(
+    url,
+    session,
+    weather_variable,
+    time_interval,
+    weather_type,
+    adaptive_window=None,
+    headers=None,
+    decode=None,
+    cache=None,
+    progress=None,
+):
+    params = create_params(weather_type, time_interval)
+    cached = None
+    if cache is not None:
+        cached = cache.get(url, params)
+        headers = {**(headers or {}), **cache.conditional_headers(cached)}
+
+    started = time.monotonic()
+    try:
+        async with session.get(
+            url,
+            params=params,
+            headers=headers,
+            raise_for_status=True,
+        ) as response:
+            if response.status == 304:
+                if cached is None:
+                    # e.g. replayed from a recording made against a cache
+                    raise ValueError(
+                        f"{url} answered 304 Not Modified without a cached response"
+                    )
+                return cached[0], weather_variable, url
+            body, nbytes = await _read(response, weather_variable, decode)
+            if cache is not None:
+                cache.put(
+                    url,
+                    params,
+                    body,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+    except aiohttp.ClientResponseError as e:
+        if adaptive_window is not None and e.status in WINDOW_REJECTED_STATUSES:
+            raise _WindowRejected(url, weather_variable, time_interval, e) from e
+        raise
+    if adaptive_window is not None:
+        start, end = check_time_interval(time_interval, weather_type)
+        adaptive_window.observe((end - start).days, time.monotonic() - started, nbytes)
+    if progress is not None:
+        progress.receive(nbytes)
+    return body, weather_variable, url
+
+
+async def _checkpointed(checkpoint, params, fetch):
+    response, weather_variable, url = await fetch
+    checkpoint.put(url, params, response)
+    return response, weather_variable, url
+
+
+async def _scheduled(slot, fetch, progress=None):
+    try:
+        async with slot:
+            if progress is None:
+                return await fetch
+            progress.send()
+            try:
+                return await fetch
+            finally:
+                progress.release()
+    finally:
+        # Never started when cancelled while waiting for a slot
+        fetch.close()
+
+
+async def _cancel(tasks):
+    """Cancel tasks and wait for them to finish."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _from_checkpoint(response, weather_variable, url):
+    return response, weather_variable, url
+
+
+FAILURE_COLUMNS = [
+    "url",
+    "params",
+    "status",
+    "attempts",
+    "error",
+    "weather_variable",
+    "time_interval",
+    "location",
+]
+
+
+def _failure_record(
+    url, weather_variable, time_interval, weather_type, location, error
+):
+    attempts = 1
+    if isinstance(error, RetryError):
+        attempts = error.last_attempt.attempt_number
+        error = error.last_attempt.exception()
+    if isinstance(error, aiohttp.ClientResponseError):
+        # The repr holds the request headers, API key included
+        description = f"{type(error).__name__}: {error.status}, {error.message}"
+    else:
+        description = f"{type(error).__name__}: {error}"
+    return {
+        "url": url,
+        "params": create_params(weather_type, time_interval),
+        "status": getattr(error, "status", None),
+        "attempts": attempts,
+        "error": description,
+        "weather_variable": weather_variable,
+        "time_interval": time_interval,
+        "location": location,
+    }
+
+
+async def _tolerant(
+    fetch, failures, url, weather_variable, time_interval, weather_type, location
+):
+    try:
+        return await fetch
+    except _WindowRejected:
+        # Split and retried by the run rather than reported
+        raise
+    except Exception as e:
+        failures.append(
+            _failure_record(
+                url, weather_variable, time_interval, weather_type, location, e
+            )
+        )
+        return None, weather_variable, url
+
+
+def _request(
+    url,
+    weather_variable,
+    time_interval,
+    location,
+    weather_type,
+    session,
+    headers,
+    slot,
+    adaptive_window=None,
+    checkpoint=None,
+    failures=None,
+    cache=None,
+    backend=Backend.Pandas,
+    progress=None,
+):
+    if checkpoint is not None:
+        params = create_params(weather_type, time_interval)
+        response = checkpoint.get(url, params)
+        if response is not None:
+            return _from_checkpoint(response, weather_variable, url)
+
+    fetch = _fetch(
         url,
-        params=create_params(weather_type, time_interval),
-        raise_for_status=True,
-    ) as response:
-        return await response.read(), weather_variable, url
+        session,
+        weather_variable,
+        time_interval,
+        weather_type,
+        adaptive_window,
+        headers,
+        # Checkpoints and caches store the raw body, so only stream without them
+        backend
+        if checkpoint is None and cache is None and weather_type != WeatherType.SevenDay
+        else None,
+        cache,
+        progress,
+    )
+    fetch = _scheduled(slot, fetch, progress)
+    if checkpoint is not None:
+        fetch = _checkpointed(checkpoint, params, fetch)
+    if failures is not None:
+        fetch = _tolerant(
+            fetch,
+            failures,
+            url,
+            weather_variable,
+            time_interval,
+            weather_type,
+            location,
+        )
+    return fetch
+
+
+class _Results:
+    """Assembles the responses of a run into the kind of table of its backend."""
+
+    def __init__(self, weather_type, weather_interval, backend):
+        self.weather_type = weather_type
+        self.weather_interval = weather_interval
+        self.backend = Backend(backend)
+        self._records = []
+        self._tables = []
+        if weather_type != WeatherType.SevenDay:
+            self._keys = [TIME_COLUMNS[weather_interval], "lat", "long"]
+            self._data_df = pd.DataFrame(columns=self._keys)
+
+    def add(self, response, weather_variable, url, location):
+        if self.weather_type == WeatherType.SevenDay:
+            lat, long = location or _url_location(url)
+            self._records.extend(_seven_day_records(json.loads(response), lat, long))
+        elif self.backend == Backend.Pandas:
+            self._data_df = _merge_to_full_df(
+                weather_variable,
+                self.weather_interval,
+                response,
+                self._data_df,
+                location,
+            )
+        else:
+            self._tables.append(_series_table(weather_variable, response, location))
+
+    def result(self):
+        if self.weather_type == WeatherType.SevenDay:
+            if self.backend == Backend.Pandas:
+                return json_normalize(self._records)
+            return backends.from_arrow(
+                backends.records_table(self._records), self.backend
+            )
+        if self.backend == Backend.Pandas:
+            return self._data_df
+        return backends.from_arrow(
+            backends.join_variables(self._tables, self._keys), self.backend
+        )
+
+
+def _opened(resources, store, store_class):
+    """Open ``store`` with ``store_class`` if it is given as a path, to be closed with ``resources``."""
+    if isinstance(store, str):
+        return resources.enter_context(store_class(store))
+    return store
+
+
+async def _opened_session(resources, session):
+    """Create a session if none is given, to be closed with ``resources``."""
+    if session is None:
+        session = await resources.enter_async_context(aiohttp.ClientSession())
+    return session
 
 
 async def run_queries(
@@ -323,6 +1065,17 @@ async def run_queries(
     weather_interval,
     weather_type,
     sentera_api_key=None,
+    adaptive_window=None,
+    location_list=None,
+    checkpoint=None,
+    raise_on_error=True,
+    session=None,
+    priority=Priority.Batch,
+    scheduler=None,
+    cache=None,
+    backend=Backend.Pandas,
+    progress=None,
+    progress_interval=0.5,
 ):
     """
     Make a series of asynchronous requests to the Weather API.
@@ -338,40 +1091,228 @@ async def run_queries(
     :param weather_interval: List of weather intervals, as instances of the ``sentera.weather.WeatherInterval`` Enum
     :param weather_type: List of weather types, as instances of the ``sentera.weather.WeatherType`` Enum
     :param sentera_api_key: (optional) A Sentera key giving access to the data. Has a default hard coded value that works.
-    :return: data_df: Pandas DataFrame of request results
+    :param adaptive_window: (optional) A ``sentera.weather.AdaptiveWindow`` to feed the latency and size of every
+                            *recent* response into, so the next plan can size its windows accordingly.
+    :param location_list: (optional) List of (*lat*, *long*) for each request, used to label its rows. When omitted,
+                          *seven-day-forecast* locations are read back from the URLs, and other rows keep the location
+                          echoed in the response.
+    :param checkpoint: (optional) A ``sentera.checkpoint.Checkpoint``, or a path to one, that every completed response
+                       is written to as it arrives. Requests already recorded in it are read back instead of fetched,
+                       so rerunning an interrupted job with the same plan only fetches what is missing.
+    :param raise_on_error: (optional) When False, requests that still fail after their retries are collected into a
+                           failure report instead of aborting the whole run. Defaults to True.
+    :param session: (optional) An ``aiohttp.ClientSession`` to make the requests with, so that concurrent runs can share
+                    one connection pool. It is left open. A session is created and closed per run when omitted.
+                    Credentials are sent with each request rather than stored on the session, so runs for different
+                    API keys can safely share it.
+    :param priority: (optional) Priority class of the requests, as a string or an instance of the
+                     ``sentera.scheduler.Priority`` Enum. *interactive* requests are sent ahead of waiting *batch*
+                     requests. Defaults to *batch*.
+    :param scheduler: (optional) The ``sentera.scheduler.WeatherScheduler`` to queue requests with. Defaults to the
+                      process-wide scheduler shared by every run.
+    :param cache: (optional) A ``sentera.cache.ResponseCache``, or a path to one. Responses carrying validators are
+                  stored in it, and later requests for them are revalidated with conditional requests, reading the
+                  cached body back when the server answers *304 Not Modified*.
+    :param backend: (optional) Kind of table to return, as a string or an instance of the
+                    ``sentera.backends.Backend`` Enum. With *arrow* or *polars*, responses are decoded straight into
+                    Arrow tables and joined with Arrow, without building any pandas object. Defaults to *pandas*.
+    :param progress: (optional) Callable, or list of callables, called with the progress events of the run, as
+                     described by ``sentera.progress.ProgressReporter``. Defaults to a ``sentera.progress.TqdmProgress``
+                     bar, unless the ``DISABLE_TQDM`` environment variable is set. Pass an empty list to report nothing.
+    :param progress_interval: (optional) Minimum number of seconds between two progress events. Defaults to 0.5.
+    :return: data_df: Pandas DataFrame of request results, or the table of ``backend``. When ``raise_on_error`` is False, a tuple of
+             (*data_df*, *failures*), where *failures* is a Pandas DataFrame with the ``FAILURE_COLUMNS`` of every
+             failed request, which can be passed to ``rerun_failures``.
+    """
+    if location_list is None:
+        location_list = [None] * len(url_list)
+
+    async def batches():
+        yield zip(url_list, weather_variable_list, time_interval_list, location_list)
+
+    return await run_query_batches(
+        batches(),
+        weather_interval,
+        weather_type,
+        sentera_api_key=sentera_api_key,
+        adaptive_window=adaptive_window,
+        checkpoint=checkpoint,
+        raise_on_error=raise_on_error,
+        session=session,
+        priority=priority,
+        scheduler=scheduler,
+        total=len(url_list),
+        cache=cache,
+        backend=backend,
+        progress=progress,
+        progress_interval=progress_interval,
+    )
+
+
+async def run_query_batches(
+    batches,
+    weather_interval,
+    weather_type,
+    sentera_api_key=None,
+    adaptive_window=None,
+    checkpoint=None,
+    raise_on_error=True,
+    session=None,
+    priority=Priority.Batch,
+    scheduler=None,
+    total=None,
+    cache=None,
+    backend=Backend.Pandas,
+    progress=None,
+    progress_interval=0.5,
+):
     """
+    Make asynchronous requests to the Weather API as batches of them become known.
+
+    Works like ``run_queries``, except that requests are read from an asynchronous iterable of batches and each batch
+    is sent as soon as it arrives, while later batches are still being produced. This lets the planning of requests,
+    e.g. paging through fields, overlap with fetching the weather of the requests planned so far.
+
+    :param batches: Asynchronous iterable of batches, each an iterable of (*url*, *weather_variable*,
+                    *time_interval*, *location*) tuples as described by the lists passed to ``run_queries``
+    :param weather_interval: Weather interval, as an instance of the ``sentera.weather.WeatherInterval`` Enum
+    :param weather_type: Weather type, as an instance of the ``sentera.weather.WeatherType`` Enum
+    :param total: (optional) Total number of requests, when known in advance, for progress reporting
+    :return: data_df: Pandas DataFrame of request results, or (*data_df*, *failures*), as returned by ``run_queries``.
+             See ``run_queries`` for the remaining parameters.
+    """
+    if weather_type != WeatherType.Recent:
+        adaptive_window = None
+
+    failures = []
+    url_locations = {}
     tasks = []
+    task_intervals = {}
+    completed = asyncio.Queue()
+    headers = weather_headers(sentera_api_key)
+    priority = Priority(priority)
+    if scheduler is None:
+        scheduler = get_scheduler()
+    job = object()
+    reporter = ProgressReporter(
+        progress_callbacks(progress), total=total, interval=progress_interval
+    )
+    refused_windows = _RefusedWindows(
+        adaptive_window,
+        weather_type,
+        weather_interval,
+        None if raise_on_error else failures,
+        reporter,
+    )
 
-    if sentera_api_key:
-        WEATHER_HEADER["X-API-Key"] = sentera_api_key
-
-    async with aiohttp.ClientSession(headers=WEATHER_HEADER) as session:
-        for url, weather_variable, time_interval in zip(
-            url_list, weather_variable_list, time_interval_list
-        ):
-            task = asyncio.ensure_future(
-                _fetch(url, session, weather_variable, time_interval, weather_type)
-            )
-            tasks.append(task)
+    # Closes what this run opened itself, once it is over
+    resources = contextlib.AsyncExitStack()
+
+    checkpoint = _opened(resources, checkpoint, Checkpoint)
+    cache = _opened(resources, cache, ResponseCache)
+    session = await _opened_session(resources, session)
+
+    async def run_request(url, weather_variable, time_interval, location):
+        # Built once the task starts, so cancelling it before leaves nothing unawaited
+        return await _request(
+            url,
+            weather_variable,
+            time_interval,
+            location,
+            weather_type,
+            session,
+            headers,
+            scheduler.slot(priority, job),
+            adaptive_window,
+            checkpoint,
+            None if raise_on_error else failures,
+            cache,
+            backend,
+            reporter,
+        )
 
-        if weather_type == WeatherType.SevenDay:
-            data_df = pd.DataFrame()
-        else:
-            data_df = pd.DataFrame(
-                columns=[TIME_COLUMNS[weather_interval], "lat", "long"]
-            )
+    def request_task(url, weather_variable, time_interval, location):
+        url_locations[url] = location
+        task = asyncio.ensure_future(
+            run_request(url, weather_variable, time_interval, location)
+        )
+        task.add_done_callback(completed.put_nowait)
+        tasks.append(task)
+        task_intervals[task] = time_interval
 
-        disable_tqdm = strtobool(os.environ.get("DISABLE_TQDM") or "false")
-        for f in tqdm.tqdm(
-            asyncio.as_completed(tasks), total=len(tasks), disable=disable_tqdm
-        ):
-            response, weather_variable, url = await f
-            response_json = json.loads(response)
-            if weather_type == WeatherType.SevenDay:
-                data_df = _combine_seven_day(url, response_json, data_df)
-            else:
-                data_df = _merge_to_full_df(
-                    weather_variable, weather_interval, response_json, data_df
-                )
+    def resend(url, send):
+        for weather_variable, time_interval in send:
+            request_task(url, weather_variable, time_interval, url_locations[url])
+        return len(send)
 
+    async def produce():
+        created = 0
+        try:
+            async for batch in batches:
+                for request in batch:
+                    request_task(*request)
+                    reporter.plan()
+                    created += 1
+        finally:
+            completed.put_nowait(created)
+
+    results = _Results(weather_type, weather_interval, backend)
+    producer = asyncio.ensure_future(produce())
+    try:
+        produced = False
+        created = processed = 0
+        while not produced or processed < created:
+            task = await completed.get()
+            if isinstance(task, int):
+                produced = True
+                created += task
+                continue
+            processed += 1
+
+            try:
+                response, weather_variable, url = task.result()
+            except _WindowRejected as rejected:
+                created += resend(
+                    rejected.url,
+                    refused_windows.refuse(rejected, url_locations[rejected.url]),
+                )
+                continue
+            reporter.complete(failed=response is None)
+            if response is None:
+                continue
+            results.add(response, weather_variable, url, url_locations[url])
+            created += resend(url, refused_windows.accept(url, task_intervals[task]))
+        await producer
+    finally:
+        # A failed run must not leave its requests running on a shared session
+        await _cancel([producer] + tasks)
+        reporter.close()
+        await resources.aclose()
+
+    data_df = results.result()
+    if not raise_on_error:
+        return data_df, pd.DataFrame(failures, columns=FAILURE_COLUMNS)
     return data_df
+
+
+async def rerun_failures(failures, weather_interval, weather_type, **kwargs):
+    """
+    Re-run only the requests listed in a failure report returned by ``run_queries``.
+
+    :param failures: Pandas DataFrame of failed requests, as returned by ``run_queries`` with ``raise_on_error=False``
+    :param weather_interval: Weather interval of the original run, as an instance of the
+                             ``sentera.weather.WeatherInterval`` Enum
+    :param weather_type: Weather type of the original run, as an instance of the ``sentera.weather.WeatherType`` Enum
+    :param kwargs: (optional) Any other keyword arguments accepted by ``run_queries``
+    :return: (*data_df*, *failures*) of the re-run, in the same form as ``run_queries`` with ``raise_on_error=False``
+    """
+    kwargs["raise_on_error"] = False
+    return await run_queries(
+        failures["url"].tolist(),
+        failures["weather_variable"].tolist(),
+        failures["time_interval"].tolist(),
+        weather_interval,
+        weather_type,
+        location_list=failures["location"].tolist(),
+        **kwargs,
+    )
@@ -25,6 +25,9 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     install_requires=["requests", "aiohttp", "pandas", "tenacity", "tqdm"],
     extras_require={
-        "dev": ["pytest", "sphinx_rtd_theme", "pre_commit", "m2r", "sphinx"]
+        "dev": ["pytest", "sphinx_rtd_theme", "pre_commit", "m2r", "sphinx"],
+        "http2": ["httpx[http2]"],
+        "arrow": ["pyarrow"],
+        "polars": ["polars", "pyarrow"],
     },
 )